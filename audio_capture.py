@@ -0,0 +1,217 @@
+# audio_capture.py
+
+import threading
+import time
+
+from audio_frontend import AudioFrontEnd
+from audio_sources import MicrophoneSource
+
+
+class RingBuffer:
+    """
+    Buffer circular de bytes com capacidade fixa, seguro entre threads.
+    Quando enche, sobrescreve o áudio mais antigo (preferimos perder o
+    passado a atrasar o reconhecimento do que o jogador acabou de falar).
+    """
+
+    def __init__(self, capacidade_bytes: int):
+        self.capacidade = max(1, int(capacidade_bytes))
+        self._buf = bytearray(self.capacidade)
+        self._inicio = 0      # posição de leitura
+        self._tamanho = 0     # bytes disponíveis
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._tamanho
+
+    def write(self, data: bytes) -> int:
+        """
+        Escreve os bytes no buffer e devolve quantos bytes antigos foram
+        descartados por falta de espaço.
+        """
+        n = len(data)
+        if n == 0:
+            return 0
+        with self._lock:
+            descartados = 0
+            if n >= self.capacidade:
+                # bloco maior que o buffer: fica só com o final dele
+                descartados = self._tamanho + (n - self.capacidade)
+                self._buf[:] = data[n - self.capacidade:]
+                self._inicio = 0
+                self._tamanho = self.capacidade
+                return descartados
+
+            livre = self.capacidade - self._tamanho
+            if n > livre:
+                descartados = n - livre
+                self._inicio = (self._inicio + descartados) % self.capacidade
+                self._tamanho -= descartados
+
+            fim = (self._inicio + self._tamanho) % self.capacidade
+            primeira = min(n, self.capacidade - fim)
+            self._buf[fim:fim + primeira] = data[:primeira]
+            if primeira < n:
+                self._buf[:n - primeira] = data[primeira:]
+            self._tamanho += n
+            return descartados
+
+    def read_available(self) -> bytes:
+        """Retira e devolve todo o conteúdo disponível (não bloqueia)."""
+        with self._lock:
+            if self._tamanho == 0:
+                return b""
+            fim = self._inicio + self._tamanho
+            if fim <= self.capacidade:
+                out = bytes(self._buf[self._inicio:fim])
+            else:
+                out = bytes(self._buf[self._inicio:]) + bytes(self._buf[:fim - self.capacidade])
+            self._inicio = 0
+            self._tamanho = 0
+            return out
+
+    def clear(self):
+        with self._lock:
+            self._inicio = 0
+            self._tamanho = 0
+
+
+class AudioCapture:
+    """
+    Captura de áudio fora do loop do jogo.
+
+    Uma thread lê a fonte (AudioSource: microfone, WAV ou socket), passa
+    cada bloco pelo AudioFrontEnd (reamostragem para sample_rate, DC e
+    AGC) e escreve o resultado num RingBuffer. O loop principal só chama
+    read_available() uma vez por frame, sem nunca bloquear.
+    """
+
+    BYTES_POR_AMOSTRA = 2  # int16 mono
+
+    def __init__(self, sample_rate=16000, chunk_frames=1024, buffer_segundos=4.0, device_index=None,
+                 source=None, remover_dc=True, agc=True):
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_frames
+        self.remover_dc = remover_dc
+        self.agc = agc
+        self.frontend = None
+        if source is None:
+            source = MicrophoneSource(sample_rate, chunk_frames, device_index)
+        self.source = source
+        self.ring = RingBuffer(int(buffer_segundos * sample_rate) * self.BYTES_POR_AMOSTRA)
+        # instantes (time.monotonic) do primeiro e do último bloco ainda não drenados
+        self._lock_tempo = threading.Lock()
+        self._t_primeiro = None
+        self._t_ultimo = None
+
+        self._thread_abertura = None
+        self._thread_source = None
+        self._rodando = False
+        self.status = "desligado"   # desligado, abrindo, pronto, erro
+        self.erro = None
+
+        # contadores para dimensionar o buffer
+        self.blocos_recebidos = 0
+        self.overflows_buffer = 0        # o ring encheu antes do loop drenar
+        self.frames_descartados = 0      # amostras perdidas no ring
+
+    def start(self):
+        self.status = "abrindo"
+        try:
+            self.source.start()
+        except Exception as e:
+            self.erro = e
+            self.status = "erro"
+            raise
+        # a taxa da fonte só é conhecida depois de aberta
+        if self.remover_dc or self.agc or self.source.sample_rate != self.sample_rate:
+            self.frontend = AudioFrontEnd(self.source.sample_rate, self.sample_rate,
+                                          remover_dc=self.remover_dc, agc=self.agc)
+        self._rodando = True
+        self._thread_source = threading.Thread(target=self._ler_source, daemon=True)
+        self._thread_source.start()
+        self.status = "pronto"
+
+    def _ler_source(self):
+        while self._rodando:
+            dados = self.source.read()
+            t_chegada = time.monotonic()
+            if not dados:
+                break
+            if self.frontend is not None:
+                dados = self.frontend.process(dados)
+            self._receber(dados, t_chegada)
+
+    def start_em_segundo_plano(self):
+        # abrir o dispositivo pode levar segundos (enumeração do PyAudio);
+        # o resultado fica em self.status / self.erro
+        self.status = "abrindo"
+        self._thread_abertura = threading.Thread(target=self._abrir_silencioso, daemon=True)
+        self._thread_abertura.start()
+
+    def _abrir_silencioso(self):
+        try:
+            self.start()
+        except Exception:
+            pass
+
+    def _receber(self, dados: bytes, t_chegada: float = None):
+        if not dados:
+            return
+        if t_chegada is None:
+            t_chegada = time.monotonic()
+        self.blocos_recebidos += 1
+        with self._lock_tempo:
+            descartados = self.ring.write(dados)
+            if self._t_primeiro is None:
+                self._t_primeiro = t_chegada
+            self._t_ultimo = t_chegada
+        if descartados:
+            self.overflows_buffer += 1
+            self.frames_descartados += descartados // self.BYTES_POR_AMOSTRA
+
+    def read_available(self) -> bytes:
+        return self.read_available_com_tempo()[0]
+
+    def read_available_com_tempo(self):
+        """
+        Como read_available(), mas devolve (dados, t_primeiro, t_ultimo):
+        os instantes em que chegaram o bloco mais antigo e o mais novo
+        entre os drenados (None se não havia nada).
+        """
+        with self._lock_tempo:
+            dados = self.ring.read_available()
+            t_primeiro, t_ultimo = self._t_primeiro, self._t_ultimo
+            self._t_primeiro = self._t_ultimo = None
+        return dados, t_primeiro, t_ultimo
+
+    def clear(self):
+        with self._lock_tempo:
+            self.ring.clear()
+            self._t_primeiro = self._t_ultimo = None
+
+    def stats(self) -> dict:
+        return {
+            "blocos": self.blocos_recebidos,
+            "overflows_dispositivo": getattr(self.source, "overflows_dispositivo", 0),
+            "overflows_buffer": self.overflows_buffer,
+            "frames_descartados": self.frames_descartados,
+            "buffer_bytes": self.ring.capacidade,
+            "frontend": self.frontend.stats() if self.frontend is not None else None,
+        }
+
+    def close(self):
+        if self._thread_abertura is not None:
+            self._thread_abertura.join(timeout=5.0)
+            self._thread_abertura = None
+        self._rodando = False
+        try:
+            self.source.close()
+        except Exception as e:
+            print("Erro ao fechar fonte de áudio:", e)
+        if self._thread_source is not None:
+            self._thread_source.join(timeout=1.0)
+            self._thread_source = None
+        if self.status == "pronto":
+            self.status = "desligado"
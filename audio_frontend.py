@@ -0,0 +1,199 @@
+# audio_frontend.py
+#
+# Pré-processamento do áudio antes do VAD e do Kaldi: reamostragem em
+# blocos da taxa nativa do dispositivo para 16 kHz, remoção de DC e
+# controle automático de ganho. Tudo vetorizado com NumPy, bloco a bloco.
+#
+# Benchmark do custo por bloco:
+#   python audio_frontend.py
+
+import math
+import time
+
+import numpy as np
+
+
+class BlockResampler:
+    """
+    Reamostrador polifásico racional (L/M) com estado entre blocos.
+
+    O filtro passa-baixa (sinc com janela de Kaiser) é desenhado uma vez e
+    quebrado em L fases; cada bloco vira uma única multiplicação
+    (saídas x taps) sobre o histórico + bloco novo, sem laço em Python.
+    48000 -> 16000 é L=1, M=3; 44100 -> 16000 é L=160, M=441.
+    """
+
+    def __init__(self, taxa_entrada: int, taxa_saida: int, largura=16, beta=7.0):
+        g = math.gcd(int(taxa_entrada), int(taxa_saida))
+        self.L = int(taxa_saida) // g
+        self.M = int(taxa_entrada) // g
+        self.identidade = self.L == self.M
+        if self.identidade:
+            return
+
+        # o filtro cobre `largura` amostras da taxa mais baixa das duas
+        self.taps = int(math.ceil(largura * max(1.0, self.M / self.L)))
+        n = self.taps * self.L
+        # corte um pouco abaixo da menor das duas Nyquist, relativo à taxa interpolada
+        fc = 0.5 / max(self.L, self.M) * 0.9
+        t = np.arange(n) - (n - 1) / 2
+        h = 2 * fc * np.sinc(2 * fc * t) * np.kaiser(n, beta) * self.L
+        # fases[p, j] = h[p + j*L]
+        self._fases = h.reshape(self.taps, self.L).T.astype(np.float32)
+        self._j = np.arange(self.taps)
+        self._hist = np.zeros(self.taps - 1, dtype=np.float32)
+        # posição da próxima saída na escala interpolada, relativa ao início do histórico
+        self._m = (self.taps - 1) * self.L
+
+    def reset(self):
+        if not self.identidade:
+            self._hist[:] = 0
+            self._m = (self.taps - 1) * self.L
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        if self.identidade or x.size == 0:
+            return x
+        buf = np.concatenate((self._hist, x))
+        limite = buf.size * self.L
+        n_saida = max(0, -(-(limite - self._m) // self.M))
+        ms = self._m + self.M * np.arange(n_saida)
+        fases = ms % self.L
+        base = ms // self.L
+        y = np.einsum("ij,ij->i", self._fases[fases], buf[base[:, None] - self._j])
+
+        consumidos = buf.size - (self.taps - 1)
+        self._hist = buf[consumidos:]
+        self._m += n_saida * self.M - consumidos * self.L
+        return y
+
+
+class AudioFrontEnd:
+    """
+    bytes int16 na taxa do dispositivo -> bytes int16 na taxa do reconhecedor.
+
+    - DC: a média de cada bloco alimenta uma média móvel (constante de
+      tempo dc_segundos) que é subtraída do sinal.
+    - AGC: o RMS dos blocos com sinal (acima de limiar_agc) puxa o ganho
+      para alvo_rms; o ganho desce rápido (ataque) e sobe devagar
+      (liberação), e varia em rampa dentro do bloco para não estalar.
+      Em silêncio o ganho volta para 1 (constante retorno_s): um ganho
+      alto deixado por uma fala baixa não fica amplificando o ruído da
+      sala, que o VAD logo adiante tomaria por fala.
+    """
+
+    def __init__(self, taxa_entrada: int, taxa_saida=16000, remover_dc=True, agc=True,
+                 dc_segundos=0.5, alvo_rms=3000.0, limiar_agc=200.0, ganho_min=0.25, ganho_max=8.0,
+                 ataque_s=0.05, liberacao_s=1.0, retorno_s=1.5):
+        self.taxa_entrada = int(taxa_entrada)
+        self.taxa_saida = int(taxa_saida)
+        self.resampler = BlockResampler(self.taxa_entrada, self.taxa_saida)
+        self.remover_dc = remover_dc
+        self.agc = agc
+        self.dc_segundos = dc_segundos
+        self.alvo_rms = alvo_rms
+        self.limiar_agc = limiar_agc
+        self.ganho_min = ganho_min
+        self.ganho_max = ganho_max
+        self.ataque_s = ataque_s
+        self.liberacao_s = liberacao_s
+        self.retorno_s = retorno_s
+
+        self.dc = None
+        self.ganho = 1.0
+
+        # estatísticas
+        self.blocos = 0
+        self.amostras_saturadas = 0
+        self.tempo_total_s = 0.0
+        self.tempo_max_s = 0.0
+
+    def reset(self):
+        self.resampler.reset()
+        self.dc = None
+        self.ganho = 1.0
+
+    def _coef(self, n_amostras: int, constante_s: float) -> float:
+        # peso da média móvel equivalente a n_amostras com a constante dada
+        return 1.0 - math.exp(-n_amostras / (self.taxa_saida * constante_s))
+
+    def process(self, pcm: bytes) -> bytes:
+        t0 = time.perf_counter()
+        x = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        y = self.resampler.process(x)
+        if y.size == 0:
+            return b""
+
+        if self.remover_dc:
+            media = float(y.mean())
+            if self.dc is None:
+                self.dc = media
+            else:
+                self.dc += self._coef(y.size, self.dc_segundos) * (media - self.dc)
+            y = y - self.dc
+
+        if self.agc:
+            rms = float(np.sqrt(np.mean(y * y)))
+            anterior = self.ganho
+            if rms > self.limiar_agc:
+                desejado = min(self.ganho_max, max(self.ganho_min, self.alvo_rms / rms))
+                constante = self.ataque_s if desejado < self.ganho else self.liberacao_s
+                self.ganho += self._coef(y.size, constante) * (desejado - self.ganho)
+            else:
+                self.ganho += self._coef(y.size, self.retorno_s) * (1.0 - self.ganho)
+            y = y * np.linspace(anterior, self.ganho, y.size, dtype=np.float32)
+
+        saturadas = np.count_nonzero(np.abs(y) > 32767)
+        if saturadas:
+            self.amostras_saturadas += int(saturadas)
+            np.clip(y, -32768, 32767, out=y)
+        out = y.astype(np.int16).tobytes()
+
+        dt = time.perf_counter() - t0
+        self.blocos += 1
+        self.tempo_total_s += dt
+        self.tempo_max_s = max(self.tempo_max_s, dt)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "taxa_entrada": self.taxa_entrada,
+            "taxa_saida": self.taxa_saida,
+            "blocos": self.blocos,
+            "custo_medio_us": round(self.tempo_total_s / self.blocos * 1e6, 1) if self.blocos else 0.0,
+            "custo_max_us": round(self.tempo_max_s * 1e6, 1),
+            "ganho": round(self.ganho, 2),
+            "dc": round(self.dc or 0.0, 1),
+            "amostras_saturadas": self.amostras_saturadas,
+        }
+
+
+# ---------------- benchmark: python audio_frontend.py ----------------
+
+def _benchmark(segundos=20.0, bloco_ms=64):
+    rng = np.random.default_rng(0)
+    print(f"bloco de {bloco_ms} ms; orçamento = duração do bloco (tempo real)")
+    for taxa in (16000, 44100, 48000):
+        frames = int(taxa * bloco_ms / 1000)
+        t = np.arange(int(taxa * segundos)) / taxa
+        # voz sintética fraca + offset DC + ruído
+        sinal = 400 * np.sin(2 * np.pi * 300 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0) + 800
+        sinal += rng.normal(0, 30, t.size)
+        pcm = sinal.astype(np.int16).tobytes()
+        fe = AudioFrontEnd(taxa, 16000)
+        custos = []
+        saida = 0
+        for i in range(0, len(pcm), frames * 2):
+            t0 = time.perf_counter()
+            saida += len(fe.process(pcm[i:i + frames * 2])) // 2
+            custos.append(time.perf_counter() - t0)
+        custos.sort()
+        p50 = custos[len(custos) // 2] * 1e6
+        p99 = custos[int(len(custos) * 0.99)] * 1e6
+        orcamento = bloco_ms * 1000
+        print(f"{taxa:6d} Hz -> 16000 Hz: p50 {p50:7.1f} us  p99 {p99:7.1f} us  "
+              f"({p99 / orcamento * 100:.2f}% do bloco)  saída {saida / segundos:.0f} amostras/s  "
+              f"ganho final {fe.ganho:.2f}  dc {fe.dc:.0f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
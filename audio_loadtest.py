@@ -0,0 +1,142 @@
+# audio_loadtest.py
+#
+# Teste de carga do pipeline de voz sem placa de som: sobe N pipelines
+# (SocketSource -> AudioCapture -> VAD -> RecognizerWorker), cada um em
+# uma porta TCP local, e N clientes que transmitem um WAV em tempo real.
+#
+# Uso:
+#   python audio_loadtest.py gravacao.wav --streams 8 --repeticoes 3
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+from audio_capture import AudioCapture
+from audio_sources import SocketSource, WavFileSource, transmitir
+from latency import percentil
+from vad import EnergyVAD
+from voice_commands import lista_vocabulario_xadrez
+from voice_recognizer import RecognizerWorker
+
+
+class _Pipeline:
+    def __init__(self, endereco, args):
+        self.endereco = endereco
+        self.capture = AudioCapture(sample_rate=args.sample_rate, chunk_frames=args.chunk,
+                                    source=SocketSource(endereco, args.sample_rate, args.chunk))
+        self.vad = None if args.sem_vad else EnergyVAD(sample_rate=args.sample_rate)
+        # sem partida, ninguém manda posição: parciais e gramática por posição ficam
+        # desligadas (a parcial confirmada esperaria uma posição nova para sempre)
+        self.worker = RecognizerWorker(args.modelo, args.sample_rate, grammar=lista_vocabulario_xadrez,
+                                       gramatica_dinamica=False, modo_parcial=False,
+                                       max_alternativas=args.alternativas)
+        self.latencias_ms = []
+        self.resultados = 0
+
+    def passo(self):
+        dados = self.capture.read_available()
+        if dados:
+            t = time.monotonic()
+            if self.vad is None:
+                self.worker.feed(dados, t)
+            else:
+                for pcm, fim_de_fala in self.vad.process(dados):
+                    self.worker.feed(pcm, t)
+                    if fim_de_fala:
+                        self.worker.finalize(t)
+        for msg in self.worker.poll():
+            if msg.get("tipo") == "resultado":
+                self.resultados += 1
+                self.latencias_ms.append((msg["t_decodificado"] - msg["t_audio"]) * 1000)
+
+    def fechar_frase(self):
+        # o cliente terminou: a fala que ainda estava aberta vira resultado final
+        if self.vad is None or self.vad.falando:
+            self.worker.finalize()
+        if self.vad is not None:
+            self.vad.reset()
+
+
+def _cliente(wav, endereco, repeticoes, chunk, sample_rate):
+    for _ in range(repeticoes):
+        # o WAV pode ter outra taxa: transmitir() converte para a do SocketSource
+        transmitir(WavFileSource(wav, chunk, velocidade=1.0), endereco, sample_rate)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Teste de carga do reconhecimento com vários streams.")
+    ap.add_argument("wav")
+    ap.add_argument("--streams", type=int, default=4)
+    ap.add_argument("--repeticoes", type=int, default=1)
+    ap.add_argument("--base-porta", type=int, default=5100)
+    ap.add_argument("--modelo", default="vosk-model-small-pt-0.3")
+    ap.add_argument("--sample-rate", type=int, default=16000)
+    ap.add_argument("--chunk", type=int, default=1024)
+    ap.add_argument("--alternativas", type=int, default=5)
+    ap.add_argument("--sem-vad", action="store_true")
+    ap.add_argument("--fps", type=int, default=30, help="frequência do loop que drena os streams")
+    args = ap.parse_args(argv)
+
+    pipelines = [_Pipeline(f"tcp:127.0.0.1:{args.base_porta + i}", args) for i in range(args.streams)]
+    for p in pipelines:
+        p.worker.start()
+        p.capture.start()
+    for p in pipelines:
+        if not p.worker.wait_ready(timeout=120):
+            print("Não foi possível carregar o modelo.")
+            return 1
+
+    clientes = [threading.Thread(target=_cliente,
+                                 args=(args.wav, p.endereco, args.repeticoes, args.chunk, args.sample_rate),
+                                 daemon=True) for p in pipelines]
+    t0 = time.monotonic()
+    for c in clientes:
+        c.start()
+
+    periodo = 1.0 / args.fps
+    try:
+        while any(c.is_alive() for c in clientes):
+            for p in pipelines:
+                p.passo()
+            time.sleep(periodo)
+        for p in pipelines:
+            p.passo()
+            p.fechar_frase()
+        # dá tempo para os workers esvaziarem as filas
+        fim = time.monotonic() + 2.0
+        while time.monotonic() < fim:
+            for p in pipelines:
+                p.passo()
+            time.sleep(periodo)
+    finally:
+        duracao = time.monotonic() - t0
+        for p in pipelines:
+            p.capture.close()
+            p.worker.stop()
+
+    todas = [l for p in pipelines for l in p.latencias_ms]
+    relatorio = {
+        "streams": args.streams,
+        "duracao_s": round(duracao, 2),
+        "resultados": sum(p.resultados for p in pipelines),
+        "latencia_decod_ms": {"p50": percentil(todas, 50), "p95": percentil(todas, 95),
+                              "p99": percentil(todas, 99)},
+        "por_stream": [
+            {
+                "endereco": p.endereco,
+                "resultados": p.resultados,
+                "latencia_p95_ms": percentil(p.latencias_ms, 95),
+                "captura": p.capture.stats(),
+                "vad": p.vad.stats() if p.vad is not None else None,
+            }
+            for p in pipelines
+        ],
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+# audio_sources.py
+
+import abc
+import os
+import queue
+import socket
+import sys
+import time
+import wave
+
+import numpy as np
+
+from audio_frontend import AudioFrontEnd
+
+
+class AudioSource(abc.ABC):
+    """
+    Origem de áudio PCM int16 mono para o pipeline de voz.
+
+    read() bloqueia até o próximo bloco estar disponível e devolve b""
+    quando a origem acabou. sample_rate diz a taxa dos blocos entregues.
+    """
+
+    sample_rate = 16000
+
+    def start(self):
+        pass
+
+    @abc.abstractmethod
+    def read(self) -> bytes:
+        ...
+
+    def close(self):
+        pass
+
+
+class MicrophoneSource(AudioSource):
+    """
+    Microfone via PyAudio em modo callback: a thread do PortAudio só
+    enfileira o bloco e read() entrega na ordem. O PyAudio é importado só
+    aqui, para o resto do pipeline rodar em servidores sem placa de som.
+    """
+
+    def __init__(self, sample_rate=16000, chunk_frames=1024, device_index=None, max_blocos=256,
+                 taxa_nativa=True):
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_frames
+        self.device_index = device_index
+        # abre na taxa padrão do dispositivo (44.1/48 kHz em muitos USB) e
+        # deixa a conversão para o AudioFrontEnd; sample_rate vira a taxa real
+        self.taxa_nativa = taxa_nativa
+        self._fila = queue.Queue(maxsize=max_blocos)
+        self._pa = None
+        self._stream = None
+        self.overflows_dispositivo = 0   # o próprio PortAudio perdeu áudio
+        self.blocos_descartados = 0      # fila cheia (ninguém lendo)
+
+    def start(self):
+        import pyaudio
+        self._pyaudio = pyaudio
+        self._pa = pyaudio.PyAudio()
+        if self.taxa_nativa:
+            taxa = self._taxa_padrao()
+            if taxa and taxa != self.sample_rate:
+                # mantém a duração do bloco
+                self.chunk_frames = int(round(self.chunk_frames * taxa / self.sample_rate))
+                self.sample_rate = taxa
+        try:
+            self._stream = self._pa.open(format=pyaudio.paInt16,
+                                         channels=1,
+                                         rate=self.sample_rate,
+                                         input=True,
+                                         input_device_index=self.device_index,
+                                         frames_per_buffer=self.chunk_frames,
+                                         stream_callback=self._on_audio)
+            self._stream.start_stream()
+        except Exception as e:
+            entradas = self.listar_entradas(self._pa)
+            self._pa.terminate()
+            self._pa = None
+            raise RuntimeError(f"não foi possível abrir o microfone "
+                               f"(dispositivo {self.device_index}, {self.sample_rate} Hz): {e}. "
+                               f"Entradas disponíveis: {entradas or 'nenhuma'}") from e
+
+    def _taxa_padrao(self):
+        try:
+            if self.device_index is None:
+                info = self._pa.get_default_input_device_info()
+            else:
+                info = self._pa.get_device_info_by_index(self.device_index)
+            return int(info.get("defaultSampleRate", 0)) or None
+        except Exception as e:
+            print("Aviso: não foi possível consultar a taxa do microfone:", e)
+            return None
+
+    @staticmethod
+    def listar_entradas(pa) -> list:
+        entradas = []
+        try:
+            for i in range(pa.get_device_count()):
+                info = pa.get_device_info_by_index(i)
+                if info.get("maxInputChannels", 0) > 0:
+                    entradas.append(f"{i}: {info.get('name')} ({int(info.get('defaultSampleRate', 0))} Hz)")
+        except Exception:
+            pass
+        return entradas
+
+    def _on_audio(self, in_data, frame_count, time_info, status_flags):
+        # roda na thread do PortAudio: só enfileira e volta
+        if status_flags & self._pyaudio.paInputOverflow:
+            self.overflows_dispositivo += 1
+        try:
+            self._fila.put_nowait(in_data)
+        except queue.Full:
+            self.blocos_descartados += 1
+        return (None, self._pyaudio.paContinue)
+
+    def read(self) -> bytes:
+        if self._stream is None:
+            return b""
+        return self._fila.get()
+
+    def close(self):
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+        except Exception as e:
+            print("Erro ao fechar stream de áudio:", e)
+        finally:
+            self._stream = None
+            # acorda quem estiver bloqueado em read()
+            try:
+                self._fila.put_nowait(b"")
+            except queue.Full:
+                pass
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+
+
+class WavFileSource(AudioSource):
+    """
+    Toca um arquivo WAV como se fosse o microfone.
+
+    velocidade=1.0 entrega os blocos em tempo real; 2.0 no dobro da
+    velocidade; 0 entrega tudo sem esperar (o mais rápido possível).
+    """
+
+    def __init__(self, path, chunk_frames=1024, velocidade=1.0):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.velocidade = velocidade
+        self._wav = None
+        self._canais = 1
+        self._t0 = None
+        self._frames_lidos = 0
+
+    def start(self):
+        self._wav = wave.open(self.path, "rb")
+        if self._wav.getsampwidth() != 2:
+            self._wav.close()
+            raise ValueError(f"{self.path}: só WAV PCM de 16 bits é suportado")
+        self._canais = self._wav.getnchannels()
+        self.sample_rate = self._wav.getframerate()
+        self._t0 = time.monotonic()
+        self._frames_lidos = 0
+
+    @property
+    def duracao(self) -> float:
+        if self._wav is None:
+            return 0.0
+        return self._wav.getnframes() / self.sample_rate
+
+    def read(self) -> bytes:
+        if self._wav is None:
+            return b""
+        dados = self._wav.readframes(self.chunk_frames)
+        if not dados:
+            return b""
+        if self._canais > 1:
+            # mistura os canais num só
+            amostras = np.frombuffer(dados, dtype=np.int16).reshape(-1, self._canais)
+            dados = amostras.mean(axis=1).astype(np.int16).tobytes()
+        n = len(dados) // 2
+        if self.velocidade > 0:
+            # espera até o instante em que este bloco teria sido gravado
+            alvo = self._t0 + (self._frames_lidos + n) / self.sample_rate / self.velocidade
+            espera = alvo - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+        self._frames_lidos += n
+        return dados
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+# o CPython no Windows não tem socket.AF_UNIX; lá só "tcp:" funciona
+_AF_UNIX = getattr(socket, "AF_UNIX", None)
+
+
+def _parse_endereco(endereco: str):
+    # "unix:/tmp/xadrez.sock" ou "tcp:host:porta"
+    tipo, _, resto = endereco.partition(":")
+    if tipo == "unix":
+        if _AF_UNIX is None:
+            raise ValueError(f"sockets UNIX não existem nesta plataforma: {endereco!r} (use tcp:host:porta)")
+        return _AF_UNIX, resto
+    if tipo == "tcp":
+        host, _, porta = resto.rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(porta))
+    raise ValueError(f"endereço inválido: {endereco!r} (use unix:/caminho ou tcp:host:porta)")
+
+
+class SocketSource(AudioSource):
+    """
+    Recebe PCM int16 mono cru por um socket UNIX ou TCP local.
+
+    Escuta em endereco e atende um cliente por vez; quando ele desconecta,
+    volta a esperar o próximo. Assim um pipeline de reconhecimento roda
+    sem placa de som, alimentado por clientes finos (ver transmitir()).
+    """
+
+    def __init__(self, endereco, sample_rate=16000, chunk_frames=1024):
+        self.endereco = endereco
+        self.sample_rate = sample_rate
+        self.chunk_bytes = chunk_frames * 2
+        self._servidor = None
+        self._conn = None
+        self._fechado = False
+        self._resto = b""
+        self.conexoes = 0
+
+    def start(self):
+        familia, addr = _parse_endereco(self.endereco)
+        if familia == _AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+        self._servidor = socket.socket(familia, socket.SOCK_STREAM)
+        if familia == socket.AF_INET:
+            self._servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._servidor.bind(addr)
+        self._servidor.listen(1)
+        # timeouts curtos para close() conseguir interromper read()
+        self._servidor.settimeout(0.5)
+
+    def read(self) -> bytes:
+        while not self._fechado:
+            # close() roda em outra thread e zera os sockets: trabalha com cópias locais
+            conn = self._conn
+            if conn is None:
+                servidor = self._servidor
+                if servidor is None:
+                    break
+                try:
+                    conn, _ = servidor.accept()
+                except (socket.timeout, OSError):
+                    continue
+                conn.settimeout(0.5)
+                self._conn = conn
+                self._resto = b""
+                self.conexoes += 1
+            try:
+                dados = conn.recv(self.chunk_bytes)
+            except socket.timeout:
+                continue
+            except OSError:
+                dados = b""
+            if not dados:
+                # cliente saiu (ou close()): espera o próximo
+                conn.close()
+                self._conn = None
+                continue
+            dados = self._resto + dados
+            # mantém o alinhamento de 2 bytes por amostra
+            corte = len(dados) - (len(dados) % 2)
+            self._resto = dados[corte:]
+            if corte:
+                return dados[:corte]
+        return b""
+
+    def close(self):
+        self._fechado = True
+        for s in (self._conn, self._servidor):
+            if s is not None:
+                try:
+                    s.close()
+                except OSError:
+                    pass
+        self._conn = None
+        self._servidor = None
+        familia, addr = _parse_endereco(self.endereco)
+        if familia == _AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+
+
+def abrir_fonte(spec: str, sample_rate=16000, chunk_frames=1024) -> AudioSource:
+    """
+    Cria a fonte a partir de um texto de configuração:
+      "microfone" ou "microfone:<índice>", "wav:<arquivo>[@velocidade]",
+      "unix:<caminho>", "tcp:<host>:<porta>"
+    """
+    tipo, _, resto = spec.partition(":")
+    if tipo == "microfone":
+        return MicrophoneSource(sample_rate, chunk_frames, device_index=int(resto) if resto else None)
+    if tipo == "wav":
+        caminho, _, velocidade = resto.partition("@")
+        return WavFileSource(caminho, chunk_frames, velocidade=float(velocidade) if velocidade else 1.0)
+    if tipo in ("unix", "tcp"):
+        return SocketSource(spec, sample_rate, chunk_frames)
+    raise ValueError(f"fonte de áudio desconhecida: {spec!r}")
+
+
+def transmitir(fonte: AudioSource, destino: str, sample_rate=16000):
+    """
+    Cliente fino: lê a fonte e manda o PCM cru para um SocketSource.
+
+    O socket não leva a taxa junto com o áudio: o SocketSource espera
+    sample_rate. Microfones na taxa nativa (44.1/48 kHz) e WAVs de outra
+    taxa são convertidos aqui, antes de sair; DC e AGC ficam para o lado
+    que recebe.
+    """
+    familia, addr = _parse_endereco(destino)
+    fonte.start()
+    frontend = None
+    if fonte.sample_rate != sample_rate:
+        frontend = AudioFrontEnd(fonte.sample_rate, sample_rate, remover_dc=False, agc=False)
+    with socket.socket(familia, socket.SOCK_STREAM) as s:
+        s.connect(addr)
+        try:
+            while True:
+                dados = fonte.read()
+                if not dados:
+                    break
+                if frontend is not None:
+                    dados = frontend.process(dados)
+                s.sendall(dados)
+        finally:
+            fonte.close()
+
+
+if __name__ == "__main__":
+    # ex: python audio_sources.py microfone tcp:192.168.0.10:5050
+    if len(sys.argv) != 3:
+        print("uso: python audio_sources.py <fonte> <destino unix:/caminho | tcp:host:porta>")
+        sys.exit(1)
+    try:
+        transmitir(abrir_fonte(sys.argv[1]), sys.argv[2])
+    except KeyboardInterrupt:
+        pass
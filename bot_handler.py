@@ -1,20 +1,111 @@
+import asyncio
 import os
-import queue
-from multiprocessing import Process, Queue
-from stockfish import Stockfish
+import threading
+import time
+
+import chess
+import chess.engine
+
+from opening_book import OpeningBook
+
+
+def _parametros_skill(skill: int) -> dict:
+    # o Stockfish só aceita UCI_Elo entre 1320 e 3190
+    return {
+        "UCI_LimitStrength": True,
+        "Skill Level": skill,
+        "UCI_Elo": max(1320, min(3190, 800 + skill * 200)),
+    }
+
+
+def _ply_do_fen(fen: str) -> int:
+    partes = fen.split()
+    return (int(partes[5]) - 1) * 2 + (partes[1] == "b")
+
 
 class BotHandler:
-    def __init__(self, path="stockfish.exe", default_think_ms=2000):
+    """
+    Stockfish num subprocesso persistente, dirigido por chess.engine
+    (asyncio) num loop próprio em uma thread de fundo.
+
+    A interface chama start_thinking() / cancelar() / poll() sem
+    bloquear: os pedidos entram no loop do motor com
+    call_soon_threadsafe e o lance volta num campo protegido por lock,
+    com o evento lance_pronto aceso. As linhas info da busca chegam em
+    streaming (info_busca) e servem para parar cedo num mate forçado.
+    Se o motor morre ou trava, a busca pedida volta como erro e o loop é
+    descartado; o próximo pedido sobe um Stockfish novo. O bot só fica
+    indisponível depois de max_falhas_inicio tentativas seguidas de subir
+    o motor sem sucesso.
+    Com um livro de aberturas (livro=caminho de um .bin Polyglot), os
+    lances de livro saem na hora, sem passar pelo motor.
+    """
+
+    def __init__(self, path="stockfish.exe", default_think_ms=2000, ponder=True, livro=None):
 
         # path: caminho pro stockfish
-        # default_think_ms: tempo q o bot deve pensar usando get_best_move_time
-        
+        # default_think_ms: tempo por lance sem relógio (e teto com relógio, 4x)
+        # ponder: pensa na resposta prevista enquanto o jogador pensa
+        # livro: livro de aberturas Polyglot (.bin), consultado antes do motor
+
         self.path = path
         self.available = False
         self.think_time_ms = max(50, int(default_think_ms))
-        self._process = None
-        self._result_queue = None
+        self.ponder = ponder
+        self.skill_level = 5
+        # folga do relógio para o lance aparecer na tela
+        self.margem_ms = 100
+        # tentativas seguidas de subir o motor antes de desistir do bot
+        self.max_falhas_inicio = 3
+        self.falhas_inicio = 0
+        self.livro = OpeningBook(livro) if livro else None
+
+        # lado da interface
+        self._pensando = False
+        self._t_pedido = None
+        # id (partida, ply, pedido) da busca pedida; respostas com outro id são descartadas
+        self.partida = 0
+        self._pedidos = 0
+        self._id_busca = None
+        self._fen_busca = None
+        self._lock = threading.Lock()
+        self._resultado = None
+        self.lance_pronto = threading.Event()
+        # resposta do jogador que o motor espera (e pondera), depois do último lance
+        self.resposta_prevista = None
+
+        # lado do motor (só mexido dentro do loop)
+        self._loop = None
+        self._thread = None
+        self._principal = None
+        self._comandos = None
+        self._transport = None
+        self._engine = None
+        self._analise = None
+        self._ponder = None
+        self._sem_ponder = False
+        self._previsao_herdada = None
+        # o motor morreu (ou não subiu): o loop é trocado no próximo iniciar()
+        self._motor_morto = False
+        # última linha info da busca em andamento (profundidade, score, pv...)
+        self.info_busca = {}
+
+        # estatísticas: pedido -> lance na interface
+        self.tempos_ms = []
+        self.ponder_acertos = 0
+        self.ponder_erros = 0
+        self.tempos_acerto_ms = []
+        self.buscas_canceladas = 0
+        self.resultados_descartados = 0
+        self.lances_unicos = 0
+        self.lances_livro = 0
+        self.paradas_antecipadas = 0
+        # soma dos tempos de busca pedidos ao motor
+        self.tempo_motor_ms = 0
+
         self._init_engine_check()
+        if self.livro is not None:
+            self.livro.abrir()
 
 
     # inicialização e as configurações
@@ -30,63 +121,449 @@ class BotHandler:
         self.think_time_ms = max(50, int(ms))
 
     def configure_skill(self, skill: int):
-        
-        # só armazena o nível de dificuldade para ser usado quando o processo for criado.
+
+        # só armazena o nível; vai junto com a próxima busca
 
         self.skill_level = max(0, min(20, int(skill)))
 
+    def orcamento_ms(self, board: chess.Board, wtime_s=None, btime_s=None) -> int:
 
-    # Execução isolada em processo
+        # tempo da busca: sem relógio, think_time_ms; com relógio, o que sobra
+        # dividido pelos lances que ainda devem vir. Os níveis fracos usam só
+        # uma parte disso (busca longa não muda o lance de quem erra de propósito).
+
+        fator = 0.25 + 0.75 * self.skill_level / 20
+        restante_s = wtime_s if board.turn == chess.WHITE else btime_s
+        if restante_s is None:
+            return max(50, int(self.think_time_ms * fator))
+        restante_ms = max(0.0, restante_s * 1000 - self.margem_ms)
+        faltam = max(20, 50 - board.fullmove_number)
+        ms = min(restante_ms / faltam * fator, restante_ms * 0.1, self.think_time_ms * 4)
+        return max(20, int(ms))
 
-    @staticmethod
-    def _think_worker_process(fen, think_ms, result_q, path, skill):
-        # função que roda em processo separado
-        try:
-            stockfish = Stockfish(path=path)
-            stockfish.update_engine_parameters({
-                "UCI_LimitStrength": True,
-                "Skill Level": skill,
-                "UCI_Elo": 800 + skill * 200
-            })
-            stockfish.set_fen_position(fen)
-            mv = None
-            try:
-                mv = stockfish.get_best_move_time(think_ms)
-            except Exception:
-                mv = stockfish.get_best_move()
-            result_q.put(mv)
-        except Exception as e:
-            print("Erro no processo do bot:", e)
-            result_q.put(None)
 
-    def start_thinking(self, fen: str, result_q: queue.Queue = None, think_ms: int = None):
-        
-        # inicia o processo do bot e o resultado vai ser colocado em result_q.
-        
+    # interface (thread do jogo)
+
+    def iniciar(self):
+
+        # sobe o motor uma vez só; as buscas seguintes reaproveitam o mesmo
+        # Stockfish (e a tabela de transposição dele). Pode ser chamado cedo,
+        # nos menus, para a inicialização não cair no primeiro lance.
+        # Depois de uma falha fatal, descarta o loop velho e sobe outro motor.
+
+        if self._loop is not None and self._motor_morto:
+            self._descartar_loop()
+        if not self.available or self._loop is not None:
+            return
+        self._motor_morto = False
+        self._loop = asyncio.new_event_loop()
+        self._comandos = asyncio.Queue()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="motor-xadrez", daemon=True)
+        self._thread.start()
+        self._principal = asyncio.run_coroutine_threadsafe(self._a_principal(), self._loop)
+
+    def _descartar_loop(self):
+        # o _a_principal já saiu (e matou o subprocesso): só falta parar a thread
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2.0)
+        if not self._thread.is_alive():
+            self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._principal = None
+        self._engine = None
+        self._transport = None
+        self._analise = None
+        self._ponder = None
+        self._previsao_herdada = None
+
+    def novo_jogo(self):
+        self.iniciar()
+        self.partida += 1
+        self.cancelar()
+
+    def cancelar(self):
+
+        # desistência, fim no tempo, reinício: para a busca (ou o ponder) na hora;
+        # o que ela ainda mandar é descartado pelo id
+
+        with self._lock:
+            if self._pensando:
+                self.buscas_canceladas += 1
+            self._pensando = False
+            self._id_busca = None
+            self._resultado = None
+        self.lance_pronto.clear()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._interromper, True)
+
+    def start_thinking(self, fen: str, wtime_s=None, btime_s=None, think_ms: int = None) -> bool:
+
+        # manda a posição para o motor; o lance sai em poll(). Cada pedido leva
+        # o id (partida, ply, pedido): um pedido novo substitui o anterior no motor.
+        # wtime_s/btime_s: relógios em segundos (None = sem tempo).
+
         if not self.available:
             print("Bot não disponível.")
-            return None
+            return False
+        if self._pensando and self._fen_busca == fen:
+            return True
+        self._pedidos += 1
+        id_busca = (self.partida, _ply_do_fen(fen), self._pedidos)
+        board = chess.Board(fen)
+        legais = list(board.legal_moves)
+        with self._lock:
+            if self._pensando:
+                self.buscas_canceladas += 1
+            self._pensando = True
+            self._id_busca = id_busca
+            self._fen_busca = fen
+            self._resultado = None
+            self._t_pedido = time.monotonic()
+        self.lance_pronto.clear()
+
+        # lance forçado ou de livro: nem passa pelo motor (que para o ponder, se houver)
+        lance = legais[0] if len(legais) == 1 else None
+        if lance is not None:
+            self.lances_unicos += 1
+        elif self.livro is not None:
+            lance = self.livro.escolher(board, self.skill_level)
+            if lance is not None:
+                self.lances_livro += 1
+        if lance is not None:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._interromper, True)
+            self._entregar(id_busca, "lance", lance.uci(), None, None, False)
+            return True
 
         if think_ms is None:
-            think_ms = self.think_time_ms
-        if result_q is None:
-            result_q = Queue()
-
-        # evita iniciar dois processos ao mesmo tempo
-        if self._process and self._process.is_alive():
-            return self._result_queue
-
-        # inicia o processo separado
-        p = Process(target=BotHandler._think_worker_process,
-                    args=(fen, think_ms, result_q, self.path, getattr(self, "skill_level", 5)),
-                    daemon=True)
-        p.start()
-        self._process = p
-        self._result_queue = result_q
-        return result_q
+            think_ms = self.orcamento_ms(board, wtime_s, btime_s)
+        self.tempo_motor_ms += think_ms
+        self.iniciar()
+        if self._loop is None:
+            # o motor acabou de ser dado como perdido (falhas seguidas ao subir)
+            self._entregar(id_busca, "fatal", "motor indisponível")
+            return True
+        # a busca anterior (se ainda rodar) para já; o ponder fica, pode ser acerto
+        self._loop.call_soon_threadsafe(self._interromper, False)
+        self._loop.call_soon_threadsafe(self._comandos.put_nowait,
+                                        (id_busca, board, think_ms, self.skill_level, self.partida))
+        return True
+
+    def poll(self):
+
+        # lance (uci) da busca pedida; "" se o motor falhou; None enquanto pensa
+
+        if not self._pensando:
+            return None
+        with self._lock:
+            resultado, self._resultado = self._resultado, None
+            if resultado is None:
+                return None
+            self._pensando = False
+            self._id_busca = None
+        self.lance_pronto.clear()
+        tipo = resultado[0]
+        if tipo == "lance":
+            _, lance, self.resposta_prevista, previsao, parou_cedo = resultado
+            ms = (time.monotonic() - self._t_pedido) * 1000
+            self.tempos_ms.append(ms)
+            if previsao == "acerto":
+                self.ponder_acertos += 1
+                self.tempos_acerto_ms.append(ms)
+            elif previsao == "erro":
+                self.ponder_erros += 1
+            if parou_cedo:
+                self.paradas_antecipadas += 1
+            return lance or ""
+        print("Erro no motor do bot:", resultado[1])
+        return ""
 
     def is_thinking(self) -> bool:
-        return self._process is not None and self._process.is_alive()
+        return self._pensando
+
+    def stats(self) -> dict:
+        def mediana(valores):
+            return round(sorted(valores)[len(valores) // 2], 1) if valores else None
+        previsoes = self.ponder_acertos + self.ponder_erros
+        return {
+            "buscas": len(self.tempos_ms),
+            "primeira_ms": round(self.tempos_ms[0], 1) if self.tempos_ms else None,
+            "p50_ms": mediana(self.tempos_ms),
+            "max_ms": round(max(self.tempos_ms), 1) if self.tempos_ms else None,
+            "ponder_acertos": self.ponder_acertos,
+            "ponder_erros": self.ponder_erros,
+            "taxa_ponder": round(self.ponder_acertos / previsoes, 2) if previsoes else None,
+            "p50_acerto_ms": mediana(self.tempos_acerto_ms),
+            "buscas_canceladas": self.buscas_canceladas,
+            "resultados_descartados": self.resultados_descartados,
+            "lances_unicos": self.lances_unicos,
+            "lances_livro": self.lances_livro,
+            "paradas_antecipadas": self.paradas_antecipadas,
+            "tempo_motor_s": round(self.tempo_motor_ms / 1000, 1),
+        }
+
+    def close(self):
+        if self.livro is not None:
+            self.livro.close()
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._interromper, True)
+        self._loop.call_soon_threadsafe(self._comandos.put_nowait, None)
+        try:
+            self._principal.result(timeout=3.0)
+        except Exception:
+            # motor travado: mata o subprocesso
+            self._loop.call_soon_threadsafe(self._matar)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2.0)
+        self._loop = None
+
+    def _entregar(self, id_busca, *resultado) -> bool:
+        # chamado do loop do motor (ou da interface, no lance único)
+        with self._lock:
+            if not self._pensando:
+                return False
+            if resultado[0] != "fatal" and id_busca != self._id_busca:
+                # resposta de uma busca cancelada ou substituída
+                self.resultados_descartados += 1
+                return False
+            self._resultado = resultado
+        self.lance_pronto.set()
+        return True
+
+
+    # motor (loop asyncio na thread de fundo)
+
+    async def _a_principal(self):
+        try:
+            self._transport, self._engine = await asyncio.wait_for(
+                chess.engine.popen_uci(self.path), timeout=10.0)
+        except Exception as e:
+            self._fatal(f"não foi possível iniciar o motor: {e}", no_inicio=True)
+            return
+        self.falhas_inicio = 0
+        while True:
+            pedido = await self._comandos.get()
+            if pedido is None:
+                break
+            try:
+                await self._a_pensar(*pedido)
+            except (chess.engine.EngineTerminatedError, asyncio.TimeoutError) as e:
+                # o binário morreu ou travou; sem motor não há o que fazer aqui
+                self._fatal(str(e) or "o motor não respondeu")
+                self._matar()
+                return
+            except Exception as e:
+                self._analise = None
+                self._entregar(pedido[0], "erro", str(e))
+        await self._a_parar_ponder()
+        try:
+            await asyncio.wait_for(self._engine.quit(), timeout=2.0)
+        except (chess.engine.EngineTerminatedError, asyncio.TimeoutError):
+            self._matar()
+
+    async def _a_pensar(self, id_busca, board, think_ms, skill, partida):
+        with self._lock:
+            if id_busca != self._id_busca:
+                # pedido já substituído ou cancelado antes de começar
+                return
+        self._sem_ponder = False
+        # um pedido que substitui outro herda a previsão errada dele
+        previsao, self._previsao_herdada = self._previsao_herdada, None
+        prazo = None
+        ponder = self._ponder
+        if ponder is not None:
+            self._ponder = None
+            if ponder["fen"] == board.fen():
+                # a análise do ponder já está na posição certa: continua, e para
+                # quando vencer o tempo da busca contado desde o início do ponder
+                previsao = "acerto"
+                analise = ponder["analise"]
+                prazo = ponder["inicio"] + think_ms / 1000
+            else:
+                previsao = "erro"
+                await self._a_parar(ponder["analise"])
+        if previsao != "acerto":
+            analise = await self._engine.analysis(board, chess.engine.Limit(time=think_ms / 1000),
+                                                  game=partida, options=_parametros_skill(skill))
+        self._analise = analise
+        parou_cedo = await asyncio.wait_for(self._a_acompanhar(analise, prazo), timeout=think_ms / 1000 + 10.0)
+        melhor = await analise.wait()
+        self._analise = None
+        lance = melhor.move.uci() if melhor.move else None
+        resposta = melhor.ponder.uci() if melhor.ponder else None
+        entregue = self._entregar(id_busca, "lance", lance, resposta, previsao, parou_cedo)
+        if not entregue and not self._sem_ponder:
+            self._previsao_herdada = previsao
+
+        if self.ponder and entregue and resposta and not self._sem_ponder:
+            prevista = board.copy(stack=False)
+            prevista.push(melhor.move)
+            prevista.push(melhor.ponder)
+            # análise sem limite na posição prevista, parada no próximo pedido
+            analise = await self._engine.analysis(prevista, game=partida, options=_parametros_skill(skill))
+            self._ponder = {"analise": analise, "fen": prevista.fen(), "inicio": asyncio.get_running_loop().time()}
+            if self._sem_ponder:
+                # cancelado enquanto o ponder subia
+                await self._a_parar_ponder()
+
+    async def _a_acompanhar(self, analise, prazo) -> bool:
+        # consome as linhas info; para a análise no prazo (ponder acertado) ou
+        # num mate forçado visto em duas iterações seguidas
+        loop = asyncio.get_running_loop()
+        mate_profundidade = None
+        parou_cedo = False
+        while True:
+            espera = None if prazo is None else max(0.0, prazo - loop.time())
+            try:
+                info = await asyncio.wait_for(analise.get(), timeout=espera)
+            except chess.engine.AnalysisComplete:
+                return parou_cedo
+            except asyncio.TimeoutError:
+                analise.stop()
+                prazo = None
+                continue
+            self.info_busca = info
+            score = info.get("score")
+            if parou_cedo or score is None or not score.is_mate() or info.get("multipv", 1) != 1:
+                continue
+            profundidade = info.get("depth", 0)
+            if mate_profundidade is not None and profundidade > mate_profundidade:
+                analise.stop()
+                parou_cedo = True
+            mate_profundidade = profundidade
+
+    async def _a_parar(self, analise):
+        analise.stop()
+        try:
+            await asyncio.wait_for(analise.wait(), timeout=10.0)
+        except chess.engine.EngineError:
+            pass
+
+    async def _a_parar_ponder(self):
+        ponder, self._ponder = self._ponder, None
+        if ponder is not None:
+            await self._a_parar(ponder["analise"])
+
+    def _interromper(self, com_ponder: bool):
+        # roda no loop: para a busca em andamento; o resultado dela vai ser descartado
+        if self._analise is not None:
+            self._analise.stop()
+        if com_ponder:
+            self._sem_ponder = True
+            self._previsao_herdada = None
+            if self._ponder is not None:
+                self._ponder["analise"].stop()
+                self._ponder = None
+
+    def _fatal(self, mensagem, no_inicio=False):
+        # a busca pedida (se houver) volta como erro; o próximo pedido sobe outro motor
+        self._motor_morto = True
+        if no_inicio:
+            self.falhas_inicio += 1
+            if self.falhas_inicio >= self.max_falhas_inicio:
+                print(f"Motor do bot não iniciou {self.falhas_inicio} vezes seguidas; bot desligado.")
+                self.available = False
+        self._entregar(None, "fatal", mensagem)
+
+    def _matar(self):
+        if self._transport is not None:
+            try:
+                self._transport.kill()
+            except ProcessLookupError:
+                pass
+
+
+# ---------------- benchmark: python bot_handler.py [stockfish] ----------------
+
+def _pensar_processo_novo(fen, think_ms, result_q, path, skill):
+    # como era antes: um processo e um Stockfish novos para cada lance
+    from stockfish import Stockfish
+    try:
+        stockfish = Stockfish(path=path)
+        stockfish.update_engine_parameters(_parametros_skill(skill))
+        stockfish.set_fen_position(fen)
+        result_q.put(stockfish.get_best_move_time(think_ms))
+    except Exception as e:
+        print("Erro no processo do bot:", e)
+        result_q.put(None)
+
+
+def _benchmark(path, lances=20, think_ms=100, skill=5):
+    import random
+    from multiprocessing import Process, Queue
+
+    # posições de uma partida aleatória fixa, na vez das pretas
+    rng = random.Random(0)
+    board = chess.Board()
+    posicoes = []
+    while len(posicoes) < lances:
+        if board.is_game_over():
+            board.reset()
+        board.push(rng.choice(list(board.legal_moves)))
+        if board.turn == chess.BLACK and not board.is_game_over():
+            posicoes.append(board.fen())
+
+    def resumo(nome, tempos):
+        extra = sorted(t - think_ms for t in tempos)
+        print(f"{nome:20s} primeiro lance {tempos[0]:7.1f} ms   além do think_ms: "
+              f"p50 {extra[len(extra) // 2]:6.1f} ms  max {extra[-1]:6.1f} ms")
+
+    def esperar_lance(bot):
+        bot.lance_pronto.wait(timeout=30.0)
+        return bot.poll()
+
+    tempos = []
+    for fen in posicoes:
+        q = Queue()
+        t0 = time.perf_counter()
+        p = Process(target=_pensar_processo_novo, args=(fen, think_ms, q, path, skill), daemon=True)
+        p.start()
+        q.get()
+        tempos.append((time.perf_counter() - t0) * 1000)
+        p.join()
+    resumo("processo por lance", tempos)
+
+    bot = BotHandler(path=path, default_think_ms=think_ms, ponder=False)
+    bot.configure_skill(skill)
+    tempos = []
+    for fen in posicoes:
+        t0 = time.perf_counter()
+        bot.start_thinking(fen, think_ms=think_ms)
+        esperar_lance(bot)
+        tempos.append((time.perf_counter() - t0) * 1000)
+    bot.close()
+    resumo("motor persistente", tempos)
+    print(f"({lances} lances de {think_ms} ms; o primeiro do motor persistente inclui subir o processo)")
+
+    # ponder: o "jogador" joga a resposta prevista pelo motor metade das
+    # vezes, depois de pensar o mesmo tanto que o bot
+    bot = BotHandler(path=path, default_think_ms=think_ms, ponder=True)
+    bot.configure_skill(skill)
+    bot.novo_jogo()
+    board = chess.Board()
+    tempos = []
+    while len(tempos) < lances and not board.is_game_over():
+        t0 = time.perf_counter()
+        bot.start_thinking(board.fen(), think_ms=think_ms)
+        lance = esperar_lance(bot)
+        tempos.append((time.perf_counter() - t0) * 1000)
+        board.push_uci(lance)
+        if board.is_game_over():
+            break
+        time.sleep(think_ms / 1000)
+        if bot.resposta_prevista and rng.random() < 0.5:
+            board.push_uci(bot.resposta_prevista)
+        else:
+            board.push(rng.choice(list(board.legal_moves)))
+    estat = bot.stats()
+    bot.close()
+    resumo("com ponder", tempos)
+    print(f"acertos do ponder: {estat['ponder_acertos']}/{estat['ponder_acertos'] + estat['ponder_erros']}  "
+          f"(p50 do lance num acerto: {estat['p50_acerto_ms']} ms)")
+
 
-    def get_result_queue(self):
-        return self._result_queue
+if __name__ == "__main__":
+    import sys
+    _benchmark(sys.argv[1] if len(sys.argv) > 1 else "stockfish.exe")
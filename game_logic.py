@@ -16,6 +16,49 @@ def move_to_custom_notation(move: chess.Move):
     return f"{col_from}-{lin_from} → {col_to}-{lin_to}"
 
 
+class LegalMoveIndex:
+    """
+    Índice das jogadas legais da posição, refeito uma vez por lance.
+    Permite resolver comandos curtos ("cavalo f três", "e quatro") por
+    dicionário, sem varrer board.legal_moves a cada hipótese de voz.
+    """
+
+    def __init__(self, board: chess.Board = None):
+        self.por_peca_destino = {}  # (piece_type, to_square) -> [moves]
+        self.por_destino = {}       # to_square -> [moves]
+        self.legais = frozenset()
+        if board is not None:
+            self.rebuild(board)
+
+    def rebuild(self, board: chess.Board):
+        por_peca_destino = {}
+        por_destino = {}
+        legais = list(board.legal_moves)
+        for mv in legais:
+            peca = board.piece_type_at(mv.from_square)
+            por_peca_destino.setdefault((peca, mv.to_square), []).append(mv)
+            por_destino.setdefault(mv.to_square, []).append(mv)
+        self.por_peca_destino = por_peca_destino
+        self.por_destino = por_destino
+        self.legais = frozenset(legais)
+
+    def __contains__(self, move):
+        return move in self.legais
+
+    def lookup(self, destino: int, peca: int = None, promocao: int = None) -> list:
+        """
+        Jogadas legais que terminam em destino (e movem peca, se dada).
+        Sem promoção explícita, só a promoção para dama entra na lista.
+        """
+        if peca is None:
+            moves = self.por_destino.get(destino, [])
+        else:
+            moves = self.por_peca_destino.get((peca, destino), [])
+        if promocao is None:
+            return [mv for mv in moves if mv.promotion in (None, chess.QUEEN)]
+        return [mv for mv in moves if mv.promotion == promocao]
+
+
 class GameState:
     def __init__(self):
         self.reset_game()
@@ -27,6 +70,14 @@ class GameState:
         self.historico_san = []
         self.resultado_final = ""
         self.pending_promotion = None  # {'from': sq_from, 'to': sq_to}
+        self.indice_legal = LegalMoveIndex(self.board)
+        # jogadas por voz na partida e quantas vieram de uma alternativa
+        # do N-best que não era a primeira
+        self.estatisticas_voz = {"jogadas": 0, "alternativa_nao_primeira": 0}
+        # pré-movimento do jogador feito durante a vez do bot; se veio da
+        # voz, o índice da alternativa (conta como jogada por voz ao ser jogado)
+        self.premove = None
+        self.premove_alternativa_voz = None
         self.update_historico_full()
 
     def push_move(self, move: chess.Move):
@@ -34,8 +85,53 @@ class GameState:
         Aplica a jogada ao tabuleiro e atualiza histórico incrementalmente.
         """
         self.board.push(move)
+        self.indice_legal.rebuild(self.board)
         self.update_historico_incremental(move)
 
+    def _tabuleiro_premove(self) -> chess.Board:
+        # posição atual com a vez passada para o jogador
+        tabuleiro = self.board.copy(stack=False)
+        tabuleiro.push(chess.Move.null())
+        return tabuleiro
+
+    def fen_premove(self) -> str:
+        # posição usada pelo reconhecedor de voz durante a vez do bot
+        return self._tabuleiro_premove().fen()
+
+    def premove_plausivel(self, move: chess.Move) -> bool:
+        """
+        O pré-movimento é pensado para a posição depois do lance do bot,
+        que ainda não existe; aqui só se exige que seja um lance
+        pseudo-legal do jogador na posição atual (passando a vez).
+        """
+        return self._tabuleiro_premove().is_pseudo_legal(move)
+
+    def definir_premove(self, move: chess.Move, alternativa_voz: int = None) -> bool:
+        if move is None or not self.premove_plausivel(move):
+            return False
+        self.premove = move
+        self.premove_alternativa_voz = alternativa_voz
+        return True
+
+    def tomar_premove(self):
+        """
+        Chamado logo depois do lance do bot: devolve o pré-movimento se
+        ele ficou legal na posição nova (e limpa o slot de qualquer jeito).
+        Um pré-movimento por voz só entra nas estatísticas aqui, se for jogado.
+        """
+        move, self.premove = self.premove, None
+        alternativa, self.premove_alternativa_voz = self.premove_alternativa_voz, None
+        if move is not None and move in self.indice_legal:
+            if alternativa is not None:
+                self.registrar_jogada_voz(alternativa)
+            return move
+        return None
+
+    def registrar_jogada_voz(self, indice_alternativa: int):
+        self.estatisticas_voz["jogadas"] += 1
+        if indice_alternativa > 0:
+            self.estatisticas_voz["alternativa_nao_primeira"] += 1
+
     def update_historico_full(self):
         self.historico_san = []
         for i, mv in enumerate(self.board.move_stack):
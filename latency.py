@@ -0,0 +1,128 @@
+# latency.py
+
+import bisect
+import json
+import math
+import time
+
+
+def percentil(valores, p):
+    # percentil exato de uma lista de amostras (o LatencyHistogram tem o dele, por balde)
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+class LatencyHistogram:
+    """
+    Histograma de latências (ms) com baldes fixos em escala logarítmica.
+
+    Registrar é uma busca binária nos limites e um incremento; a memória
+    não cresce com o número de amostras. Os percentis saem com a
+    resolução de um balde (~12% com 20 baldes por década).
+    """
+
+    def __init__(self, minimo_ms=0.05, maximo_ms=20000.0, baldes_por_decada=20):
+        n = int(math.ceil(math.log10(maximo_ms / minimo_ms) * baldes_por_decada))
+        self.limites = [minimo_ms * 10 ** (i / baldes_por_decada) for i in range(n + 1)]
+        # contagens[i] = amostras <= limites[i]; a última posição guarda o que passou do máximo
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.n = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, ms: float):
+        ms = max(0.0, ms)
+        self.contagens[bisect.bisect_left(self.limites, ms)] += 1
+        self.n += 1
+        self.soma += ms
+        self.maximo = max(self.maximo, ms)
+
+    def percentil(self, p: float):
+        if self.n == 0:
+            return None
+        alvo = max(1, int(math.ceil(p / 100 * self.n)))
+        acumulado = 0
+        for i, c in enumerate(self.contagens):
+            acumulado += c
+            if acumulado >= alvo:
+                # limite superior do balde, sem passar do maior valor visto
+                return min(self.limites[i], self.maximo) if i < len(self.limites) else self.maximo
+        return self.maximo
+
+    def resumo(self) -> dict:
+        return {
+            "n": self.n,
+            "media": round(self.soma / self.n, 2) if self.n else None,
+            "p50": self._arredondar(self.percentil(50)),
+            "p95": self._arredondar(self.percentil(95)),
+            "p99": self._arredondar(self.percentil(99)),
+            "max": round(self.maximo, 2),
+        }
+
+    @staticmethod
+    def _arredondar(v):
+        return None if v is None else round(v, 2)
+
+
+class VoiceLatencyTracker:
+    """
+    Latências do caminho de voz, por etapa, a partir dos instantes
+    monotônicos que viajam com cada bloco e cada resultado:
+
+      espera_captura  bloco chegou no ring -> loop do jogo drenou
+      ate_worker      bloco chegou no ring -> worker tirou da fila
+      decodificacao   AcceptWaveform / PartialResult / FinalResult
+      interpretacao   parse do texto + jogadas legais (+ casamento aproximado)
+      entrega         resultado pronto no worker -> poll do loop do jogo
+      aplicacao       checagem de legalidade + push_move
+      total           bloco que fechou a frase -> jogada aplicada
+    """
+
+    ETAPAS = ("espera_captura", "ate_worker", "decodificacao", "interpretacao",
+              "entrega", "aplicacao", "total")
+
+    def __init__(self):
+        self.histogramas = {etapa: LatencyHistogram() for etapa in self.ETAPAS}
+
+    def registrar(self, etapa: str, ms: float):
+        self.histogramas[etapa].registrar(ms)
+
+    def registrar_jogada(self, resultado: dict, t_recebido: float, t_aplicado: float):
+        """Etapas de um resultado que virou jogada (instantes em segundos)."""
+        t_audio = resultado["t_audio"]
+        t_worker = resultado.get("t_worker", t_audio)
+        t_aceito = resultado.get("t_aceito", t_worker)
+        t_decodificado = resultado["t_decodificado"]
+        self.registrar("ate_worker", (t_worker - t_audio) * 1000)
+        self.registrar("decodificacao", (t_aceito - t_worker) * 1000)
+        self.registrar("interpretacao", (t_decodificado - t_aceito) * 1000)
+        self.registrar("entrega", (t_recebido - t_decodificado) * 1000)
+        self.registrar("aplicacao", (t_aplicado - t_recebido) * 1000)
+        self.registrar("total", (t_aplicado - t_audio) * 1000)
+
+    def resumo(self) -> dict:
+        return {etapa: h.resumo() for etapa, h in self.histogramas.items()}
+
+    def linhas_overlay(self) -> list:
+        linhas = ["latência de voz (ms)   p50 / p95 / p99"]
+        for etapa, h in self.histogramas.items():
+            if h.n == 0:
+                continue
+            p50, p95, p99 = (h.percentil(p) for p in (50, 95, 99))
+            linhas.append(f"{etapa:15s} {p50:7.1f} {p95:7.1f} {p99:7.1f}  (n={h.n})")
+        return linhas
+
+    def salvar(self, path: str):
+        dados = {
+            "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "resumo": self.resumo(),
+            "baldes": {
+                etapa: {"limites_ms": [round(l, 4) for l in h.limites], "contagens": h.contagens}
+                for etapa, h in self.histogramas.items()
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=2, ensure_ascii=False)
@@ -3,103 +3,19 @@
 import os
 import sys
 import time
-import queue
 import pygame
 import chess
-import vosk
-import pyaudio
-import json
-import re
 
 from ui_renderer import UIRenderer
 from game_logic import GameState
 from bot_handler import BotHandler
+from latency import VoiceLatencyTracker
+from voice_channel import VoiceChannel
+from voice_commands import lista_vocabulario_xadrez
 
 # constantes principais
 FPS = 30
 
-# Crie esta lista no início do seu código, antes de inicializar o Vosk.
-
-lista_vocabulario_xadrez = [
-    # Comandos
-    "mover", "mova", "jogar", "para",
-
-    # Peças
-    "peão", "torre", "cavalo", "bispo", "rainha", "rei",
-
-    # Casas (escritas como falamos para maior precisão)
-    "a um", "a dois", "a três", "a quatro", "a cinco", "a seis", "a sete", "a oito",
-    "b um", "b dois", "b três", "b quatro", "b cinco", "b seis", "b sete", "b oito",
-    "c um", "c dois", "c três", "c quatro", "c cinco", "c seis", "c sete", "c oito",
-    "d um", "d dois", "d três", "d quatro", "d cinco", "d seis", "d sete", "d oito",
-    "e um", "e dois", "e três", "e quatro", "e cinco", "e seis", "e sete", "e oito",
-    "f um", "f dois", "f três", "f quatro", "f cinco", "f seis", "f sete", "f oito",
-    "g um", "g dois", "g três", "g quatro", "g cinco", "g seis", "g sete", "g oito",
-    "h um", "h dois", "h três", "h quatro", "h cinco", "h seis", "h sete", "h oito",
-
-    "[unk]"
-]
-def parse_voice_command(text: str) -> chess.Move | None:
-    """
-    Interpreta o texto reconhecido, que pode conter números por extenso
-    (ex: "dois"), e tenta extrair um movimento de xadrez no formato UCI.
-    Retorna um objeto chess.Move ou None.
-    """
-    # 1. Dicionário para mapear o número falado para o dígito correspondente.
-    numeros_por_extenso = {
-        "um": "1", "dois": "2", "três": "3", "quatro": "4",
-        "cinco": "5", "seis": "6", "sete": "7", "oito": "8"
-    }
-    
-    # Cria uma parte da regex dinamicamente para incluir todos os números.
-    # Isso resultará em "(um|dois|três|...|oito)"
-    numeros_regex = "|".join(numeros_por_extenso.keys())
-
-    # 2. Expressão regular aprimorada.
-    # Agora ela captura a letra e o número falado separadamente.
-    # Ex: Para "g um", captura "g" e "um".
-    padrao = re.compile(
-        r"mover .* ([a-h]) (" + numeros_regex + r") para ([a-h]) (" + numeros_regex + r")", 
-        re.IGNORECASE
-    )
-    
-    match = padrao.search(text)
-    
-    if match:
-        # A regex agora captura 4 grupos:
-        # (letra_origem, numero_falado_origem, letra_destino, numero_falado_destino)
-        letra_origem, num_falado_origem, letra_destino, num_falado_destino = match.groups()
-
-        # 3. Lógica de conversão.
-        # Usa o dicionário para obter os dígitos.
-        digito_origem = numeros_por_extenso.get(num_falado_origem.lower())
-        digito_destino = numeros_por_extenso.get(num_falado_destino.lower())
-
-        # Verifica se a conversão funcionou (segurança extra)
-        if not (digito_origem and digito_destino):
-            return None
-
-        # Monta a string UCI final (ex: "g1f3")
-        uci_move = f"{letra_origem}{digito_origem}{letra_destino}{digito_destino}"
-        
-        print(f"Comando de voz processado: '{text}' -> Movimento UCI: '{uci_move}'")
-
-        try:
-            # Lógica simples para promoção de peão (sempre promove para rainha 'q')
-            # Você pode tornar isso mais sofisticado depois, se quiser.
-            if (digito_origem == '7' and digito_destino == '8') or \
-               (digito_origem == '2' and digito_destino == '1'):
-                # Precisamos verificar se a peça é um peão, mas a string UCI não tem essa info.
-                # A validação `if move in board.legal_moves` no loop principal cuidará disso.
-                # Se for uma jogada de promoção legal, o motor de xadrez exigirá o sufixo.
-                uci_move += 'q'
-
-            return chess.Move.from_uci(uci_move)
-        except ValueError:
-            return None
-            
-    return None
-
 
 def main():
     pygame.init()
@@ -112,7 +28,9 @@ def main():
                     caminho_imagens=os.path.join(BASE_DIR, "imagens"),
                     caminho_sons=os.path.join(BASE_DIR, "assets", "sounds"))
     state = GameState()
-    bot = BotHandler(path=os.path.join(BASE_DIR, "stockfish.exe"), default_think_ms=2000)
+    # ponder: o motor segue pensando na resposta prevista durante a vez do jogador
+    bot = BotHandler(path=os.path.join(BASE_DIR, "stockfish.exe"), default_think_ms=2000, ponder=True,
+                     livro=os.path.join(BASE_DIR, "assets", "livro", "abertura.bin"))
 
     estado_jogo = "MENU_PRINCIPAL"  # MENU_PRINCIPAL, MENU_DIFICULDADE, MENU_COR, MENU_TEMPO, JOGANDO, FIM_DE_JOGO
     modo_jogo = None  # "pvp" or "pvb"
@@ -126,15 +44,47 @@ def main():
     tempo_pretas = None
     ultimo_update_relogio = pygame.time.get_ticks()
 
-
-    # fila para pensamento do bot
-    bot_result_queue = None
     
         # ---------- CONFIGURAÇÃO DO VOSK E PYAUDIO ----------
     MODEL_PATH = "vosk-model-small-pt-0.3"  # <-- MUDE AQUI para o nome da sua pasta de modelo
     SAMPLE_RATE = 16000
-    CHUNK_SIZE = 8192
+    CHUNK_SIZE = 1024  # frames por callback do PyAudio (~64 ms)
+    BUFFER_AUDIO_SEGUNDOS = 4.0
+    # confirma a jogada pela parcial do Vosk, sem esperar o fim da frase;
+    # a confirmação maior reduz disparos falsos ao custo de latência
+    MODO_PARCIAL = True
+    CONFIRMACAO_PARCIAL_MS = 150
+    # gramática do Vosk refeita a cada lance só com as jogadas legais
+    GRAMATICA_DINAMICA = True
+    # N-best do Vosk: alternativas confrontadas com as jogadas legais
+    MAX_ALTERNATIVAS = 5
+    # de onde vem o áudio: "microfone", "microfone:<índice>", "wav:<arquivo>",
+    # "unix:<caminho>" ou "tcp:<host>:<porta>" (PCM cru enviado por audio_sources.py)
+    AUDIO_FONTE = "microfone"
+    # PvP com dois microfones: um canal de voz por cor, cada um com a própria
+    # captura e o próprio processo reconhecedor; só o canal do lado que está
+    # com a vez é ouvido. None = um microfone só (AUDIO_FONTE) para os dois.
+    AUDIO_FONTES_PVP = None  # ex.: {chess.WHITE: "microfone:1", chess.BLACK: "microfone:2"}
+    # o microfone abre na taxa nativa e o áudio é reamostrado para SAMPLE_RATE;
+    # antes do VAD ainda tiramos o offset DC e normalizamos o volume (AGC)
+    AUDIO_REMOVER_DC = True
+    AUDIO_AGC = True
+    # latências da voz por etapa (histogramas); F3 liga/desliga o overlay
+    MOSTRAR_LATENCIAS = False
+    ARQUIVO_LATENCIAS = "latencias_voz.json"
+    # na vez do bot, clique guarda um pré-movimento que é jogado assim que o
+    # lance do bot chega, se continuar legal. PREMOVE_POR_VOZ deixa a voz
+    # fazer o mesmo, mas aí o microfone segue decodificando durante a vez do
+    # bot (o TurnGate não pausa e a latência até "pronto" não é medida)
+    PREMOVE_POR_VOZ = False
+    # anúncio falado dos lances, montado com os clips de assets/sounds/voz:
+    # "bot" (só os lances do bot), "todos" ou None. Desligado até os clips
+    # das palavras (lista em move_announcer.py) serem gravados na pasta
+    ANUNCIAR_LANCES = None
     
+    if ANUNCIAR_LANCES:
+        ui.ativar_anuncios()
+
     # Validação do caminho do modelo
     if not os.path.exists(MODEL_PATH):
         print(f"ERRO: O diretório do modelo Vosk '{MODEL_PATH}' não foi encontrado.")
@@ -142,22 +92,32 @@ def main():
         pygame.quit()
         sys.exit()
 
-    # Inicialização
-    try:
-        model = vosk.Model(MODEL_PATH)
-        recognizer = vosk.KaldiRecognizer(model, SAMPLE_RATE, json.dumps(lista_vocabulario_xadrez, ensure_ascii=False))
-        p = pyaudio.PyAudio()
-        stream = p.open(format=pyaudio.paInt16,
-                        channels=1,
-                        rate=SAMPLE_RATE,
-                        input=True,
-                        frames_per_buffer=CHUNK_SIZE)
-        stream.start_stream()
-        print(">>> Ouvindo para comandos de voz...")
-    except Exception as e:
-        print(f"Ocorreu um erro ao inicializar o áudio: {e}")
-        # Desabilita o controle de voz se houver erro
-        stream = None
+    # Inicialização em segundo plano
+    # o modelo e o KaldiRecognizer carregam num processo próprio e o
+    # microfone abre numa thread; os menus já respondem enquanto isso e a
+    # voz liga sozinha quando os dois ficam prontos.
+    # Cada canal: captura numa thread escrevendo num ring buffer, VAD (só a
+    # fala segue para o reconhecedor) e o TurnGate, que pausa o canal fora
+    # da vez dele e descarta o que sobrou do turno anterior
+    latencias_voz = VoiceLatencyTracker()
+    mostrar_latencias = MOSTRAR_LATENCIAS
+    opcoes_reconhecedor = {"gramatica_dinamica": GRAMATICA_DINAMICA, "modo_parcial": MODO_PARCIAL,
+                           "confirmacao_ms": CONFIRMACAO_PARCIAL_MS, "max_alternativas": MAX_ALTERNATIVAS}
+    if AUDIO_FONTES_PVP:
+        fontes_voz = [("brancas" if cor == chess.WHITE else "pretas", fonte, cor)
+                      for cor, fonte in AUDIO_FONTES_PVP.items()]
+    else:
+        fontes_voz = [("microfone", AUDIO_FONTE, None)]
+    canais_voz = [VoiceChannel(nome, fonte, MODEL_PATH, cor=cor, sample_rate=SAMPLE_RATE,
+                               chunk_frames=CHUNK_SIZE, buffer_segundos=BUFFER_AUDIO_SEGUNDOS,
+                               remover_dc=AUDIO_REMOVER_DC, agc=AUDIO_AGC,
+                               grammar=lista_vocabulario_xadrez, opcoes_reconhecedor=opcoes_reconhecedor,
+                               latencias=latencias_voz)
+                  for nome, fonte, cor in fontes_voz]
+    for canal in canais_voz:
+        canal.start()
+    t_lance_bot = None
+    status_voz = "carregando"
 
     # loop principal
     rodando = True
@@ -168,6 +128,8 @@ def main():
             if event.type == pygame.QUIT:
                 rodando = False
                 break
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                mostrar_latencias = not mostrar_latencias
 
             # ---------- MENUS ----------
             if estado_jogo == "MENU_PRINCIPAL":
@@ -179,6 +141,8 @@ def main():
                 elif escolha == "pvb":
                     modo_jogo = "pvb"
                     estado_jogo = "MENU_DIFICULDADE"
+                    # o motor sobe enquanto o jogador passa pelos menus
+                    bot.iniciar()
 
             elif estado_jogo == "MENU_DIFICULDADE":
                 ui.draw_menu_dificuldade()
@@ -208,9 +172,11 @@ def main():
                     # se PVB e jogador escolheu cor, set bot skill
                     if modo_jogo == "pvb" and skill_bot is not None:
                         bot.configure_skill(skill_bot)
+                    if modo_jogo == "pvb":
+                        bot.novo_jogo()
                     # se for PVB e cor_jogador é preto, bot pensa primeiro
                     if modo_jogo == "pvb" and cor_jogador is not None and state.board.turn != cor_jogador:
-                        bot_result_queue = bot.start_thinking(state.board.fen(), result_q=None, think_ms=bot.think_time_ms)
+                        bot.start_thinking(state.board.fen(), tempo_brancas, tempo_pretas)
                     estado_jogo = "JOGANDO"
 
             # ---------- JOGANDO: eventos de jogo (não bloqueante) ----------
@@ -220,52 +186,111 @@ def main():
                 if isinstance(result, chess.Move):
                     # aplicar jogada do jogador
                     # Se for promoção, handle_jogo_event retorna a jogada já com promotion set (se seleção foi feita)
-                    if result in state.board.legal_moves:
+                    if modo_jogo == "pvb" and state.board.turn != cor_jogador:
+                        # vez do bot: vira pré-movimento
+                        if state.definir_premove(result):
+                            print("Pré-movimento:", result.uci())
+                    elif result in state.board.legal_moves:
                         # antes de push, podemos tocar som dentro de UI
                         state.push_move(result)
                         ui.play_sound_for_move(state.board, result)
+                        if ANUNCIAR_LANCES == "todos":
+                            ui.announce_move(state.board)
                         # se agora for vez do bot, iniciar thinking sem bloquear
                         if modo_jogo == "pvb" and state.board.turn != cor_jogador and not state.board.is_game_over():
-                            bot_result_queue = bot.start_thinking(state.board.fen(), result_q=None, think_ms=bot.think_time_ms)
+                            bot.start_thinking(state.board.fen(), tempo_brancas, tempo_pretas)
  
                 # se handler retornou special commands
                 elif result == "DESISTIR":
                     vencedor = "Pretas" if state.board.turn == chess.WHITE else "Brancas"
                     state.resultado_final = f"{vencedor} venceram por desistência."
                     estado_jogo = "FIM_DE_JOGO"
+                    # para a busca (ou o ponder) do bot na hora
+                    bot.cancelar()
 
             # ---------- FIM DE JOGO ----------
             elif estado_jogo == "FIM_DE_JOGO":
                 escolha = ui.handle_fim_event(event)
                 if escolha == "REINICIAR":
+                    if state.estatisticas_voz["jogadas"]:
+                        print("Estatísticas de voz da partida:", state.estatisticas_voz)
                     estado_jogo = "MENU_PRINCIPAL"
                     state.reset_game()
 
 
-        # ----- processar áudio do microfone (Vosk) -----
-        if stream and estado_jogo == "JOGANDO":
-            data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-            if recognizer.AcceptWaveform(data):
-                result_json = json.loads(recognizer.Result())
-                text = result_json.get("text", "")
-                print(text)
-
-                if text:
-                    voice_move = parse_voice_command(text)
-                    
-                    # Se o comando de voz gerou um movimento válido e é a vez do jogador
-                    if (voice_move is not None and 
-                        voice_move in state.board.legal_moves and
-                        (modo_jogo == "pvp" or state.board.turn == cor_jogador)):
-
-                        state.push_move(voice_move)
-                        ui.play_sound_for_move(state.board, voice_move)
-                        
-                        # Se for a vez do bot, inicia o pensamento dele
-                        if modo_jogo == "pvb" and state.board.turn != cor_jogador and not state.board.is_game_over():
-                            bot_result_queue = bot.start_thinking(state.board.fen(), result_q=None, think_ms=bot.think_time_ms)
-                            
-                            
+        # ----- estado do controle de voz (carregamento em segundo plano) -----
+        for canal in canais_voz:
+            canal.atualizar_status()
+        if any(canal.status == "carregando" for canal in canais_voz):
+            status_voz = "carregando"
+        elif any(canal.pronto for canal in canais_voz):
+            status_voz = "pronto"
+        else:
+            status_voz = "indisponivel"
+
+        # ----- processar áudio dos microfones (Vosk) -----
+        # o worker valida as parciais e monta a gramática a partir da
+        # posição, então ela vai antes do áudio
+        vez_do_bot = estado_jogo == "JOGANDO" and modo_jogo == "pvb" and state.board.turn != cor_jogador
+        if vez_do_bot and PREMOVE_POR_VOZ:
+            # o reconhecedor passa a entender os lances do jogador (pré-movimento)
+            fen_atual = state.fen_premove()
+        else:
+            fen_atual = state.board.fen()
+        # cor cujo lance a voz pode fazer agora
+        cor_da_voz = cor_jogador if modo_jogo == "pvb" else state.board.turn
+        for canal in canais_voz:
+            canal.set_position(fen_atual)
+            # fora da partida, na vez do bot ou na vez do outro lado o canal fica pausado
+            deve_ouvir = (estado_jogo == "JOGANDO" and canal.aceita(cor_da_voz)
+                          and (not vez_do_bot or PREMOVE_POR_VOZ))
+            canal.processar(deve_ouvir, t_lance_bot)
+        t_lance_bot = None
+
+        # ----- resultados dos reconhecedores (poll não-bloqueante) -----
+        for canal in canais_voz:
+            for resultado in canal.poll():
+                if resultado.get("tipo") != "resultado":
+                    continue
+                t_recebido = time.monotonic()
+                print(f"Comando de voz ({canal.nome}): '{resultado['texto']}' -> "
+                      f"{[mv.uci() for mv in resultado['candidatos']]}")
+                aplicado = False
+                # canal preso a uma cor só joga por ela
+                cor_do_canal = cor_jogador if modo_jogo == "pvb" else state.board.turn
+                if estado_jogo == "JOGANDO" and canal.aceita(cor_do_canal):
+                    if resultado.get("ambiguas"):
+                        print("Comando ambíguo, diga a casa de origem:", [mv.uci() for mv in resultado["ambiguas"]])
+                    for voice_move, alternativa in zip(resultado["candidatos"], resultado["alternativas"]):
+                        if modo_jogo == "pvb" and state.board.turn != cor_jogador:
+                            # vez do bot: guarda como pré-movimento
+                            if state.definir_premove(voice_move, alternativa):
+                                print("Pré-movimento por voz:", voice_move.uci())
+                                aplicado = True
+                                break
+                            continue
+                        # Se o comando de voz gerou um movimento válido e é a vez do jogador
+                        if (voice_move in state.indice_legal and
+                            (modo_jogo == "pvp" or state.board.turn == cor_jogador)):
+
+                            aplicado = True
+                            state.registrar_jogada_voz(alternativa)
+                            state.push_move(voice_move)
+                            latencias_voz.registrar_jogada(resultado, t_recebido, time.monotonic())
+                            ui.play_sound_for_move(state.board, voice_move)
+                            if ANUNCIAR_LANCES == "todos":
+                                ui.announce_move(state.board)
+
+                            # Se for a vez do bot, inicia o pensamento dele
+                            if (modo_jogo == "pvb" and state.board.turn != cor_jogador
+                                    and not state.board.is_game_over()):
+                                bot.start_thinking(state.board.fen(), tempo_brancas, tempo_pretas)
+                            break
+                if resultado.get("parcial") and not aplicado:
+                    # a parcial deixou o worker esperando uma posição nova que não vai
+                    # chegar (premove recusado, partida encerrada): libera as parciais
+                    canal.descartar()
+
         # ----- atualização dos relógios (sempre decrementar o jogador que está com a vez) -----
         now_ticks = pygame.time.get_ticks()
         if estado_jogo == "JOGANDO" and tempo_inicial is not None:
@@ -281,38 +306,56 @@ def main():
             if tempo_brancas is not None and tempo_brancas <= 0:
                 state.resultado_final = "Pretas venceram no tempo!"
                 estado_jogo = "FIM_DE_JOGO"
+                bot.cancelar()
             elif tempo_pretas is not None and tempo_pretas <= 0:
                 state.resultado_final = "Brancas venceram no tempo!"
                 estado_jogo = "FIM_DE_JOGO"
+                bot.cancelar()
 
         else:
             # atualizar tick reference
             ultimo_update_relogio = now_ticks
 
         # ----- processar resultado do bot (poll não-bloqueante) -----
-        if estado_jogo == "JOGANDO" and modo_jogo == "pvb" and bot_result_queue is not None:
-            try:
-                mv_uci = bot_result_queue.get_nowait()
-            except queue.Empty:
-                mv_uci = None
+        if estado_jogo == "JOGANDO" and modo_jogo == "pvb" and bot.is_thinking():
+            mv_uci = bot.poll()
             if mv_uci is not None:
-                if mv_uci:
-                    try:
-                        mv = chess.Move.from_uci(mv_uci)
-                        if mv in state.board.legal_moves:
-                            state.push_move(mv)
-                            ui.play_sound_for_move(state.board, mv)
-                        else:
-                            # fallback: jogada legal aleatória
-                            import random
-                            legal = list(state.board.legal_moves)
-                            if legal:
-                                mv2 = random.choice(legal)
-                                state.push_move(mv2)
-                                ui.play_sound_for_move(state.board, mv2)
-                    except Exception as e:
-                        print("Erro ao aplicar jogada do bot:", e)
-                bot_result_queue = None
+                try:
+                    mv = chess.Move.from_uci(mv_uci) if mv_uci else None
+                    if mv is None or mv not in state.board.legal_moves:
+                        # fallback (motor falhou ou lance ilegal): jogada legal aleatória
+                        import random
+                        legal = list(state.board.legal_moves)
+                        mv = random.choice(legal) if legal else None
+                    if mv is not None:
+                        state.push_move(mv)
+                        ui.play_sound_for_move(state.board, mv)
+                        t_lance_bot = time.monotonic()
+                        if ANUNCIAR_LANCES:
+                            ui.announce_move(state.board)
+                except Exception as e:
+                    print("Erro ao aplicar jogada do bot:", e)
+                # pré-movimento: conferido e jogado no mesmo frame do lance do bot
+                premove = state.tomar_premove() if not state.board.is_game_over() else None
+                if premove is not None:
+                    state.push_move(premove)
+                    ui.play_sound_for_move(state.board, premove)
+                    if ANUNCIAR_LANCES == "todos":
+                        ui.announce_move(state.board)
+                    print("Pré-movimento jogado:", premove.uci())
+
+        # vez do bot sem busca em andamento (ex.: logo depois de um pré-movimento)
+        if (estado_jogo == "JOGANDO" and modo_jogo == "pvb" and not bot.is_thinking()
+                and state.board.turn != cor_jogador and not state.board.is_game_over()):
+            if bot.available:
+                bot.start_thinking(state.board.fen(), tempo_brancas, tempo_pretas)
+            else:
+                # motor desistiu de vez: segue com lances aleatórios em vez de travar a partida
+                import random
+                mv = random.choice(list(state.board.legal_moves))
+                state.push_move(mv)
+                ui.play_sound_for_move(state.board, mv)
+                t_lance_bot = time.monotonic()
 
         # ----- checar fim de jogo pelo tabuleiro -----
         if estado_jogo == "JOGANDO" and state.board.is_game_over():
@@ -322,6 +365,7 @@ def main():
             else:
                 state.resultado_final = "Empate!"
             estado_jogo = "FIM_DE_JOGO"
+            bot.cancelar()
 
         # ----- RENDER -----
         if estado_jogo == "MENU_PRINCIPAL":
@@ -334,14 +378,37 @@ def main():
             ui.draw_menu_tempo()
         else:
             ultimo_mov = state.board.peek() if state.board.move_stack else None
-            ui.draw_board(state.board, tabuleiro_invertido, state.quadrado_selecionado, ultimo_mov)
+            ui.draw_board(state.board, tabuleiro_invertido, state.quadrado_selecionado, ultimo_mov, state.premove)
             ui.draw_panel_info(state.board, tempo_brancas, tempo_pretas, state.historico_san, modo_jogo, skill_bot, cor_jogador)
             if estado_jogo == "FIM_DE_JOGO":
                 ui.draw_end_screen(state.resultado_final)
+        if estado_jogo.startswith("MENU_"):
+            ui.draw_status_voz(status_voz)
+        if mostrar_latencias:
+            ui.draw_overlay_latencia(latencias_voz.linhas_overlay())
 
         pygame.display.flip()
 
     # saída limpa
+    if state.estatisticas_voz["jogadas"]:
+        print("Estatísticas de voz da partida:", state.estatisticas_voz)
+    for canal in canais_voz:
+        if canal.pronto:
+            print(f"Estatísticas do canal de voz ({canal.nome}):", canal.stats())
+    if ui.anunciador is not None and ui.anunciador.disponivel:
+        print("Estatísticas dos anúncios de lances:", ui.anunciador.stats())
+    if latencias_voz.histogramas["total"].n:
+        print("Latências da voz (ms):", latencias_voz.resumo()["total"])
+        try:
+            latencias_voz.salvar(ARQUIVO_LATENCIAS)
+            print(f"Histogramas de latência salvos em '{ARQUIVO_LATENCIAS}'.")
+        except OSError as e:
+            print("Erro ao salvar latências:", e)
+    if bot.tempos_ms:
+        print("Tempos do bot (pedido -> lance):", bot.stats())
+    bot.close()
+    for canal in canais_voz:
+        canal.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,218 @@
+# opening_book.py
+#
+# Livro de aberturas no formato Polyglot (.bin): entradas de 16 bytes
+# (chave Zobrist, lance, peso, learn) ordenadas pela chave. O arquivo é
+# mapeado em memória e a posição é achada por busca binária, sem ler o
+# livro inteiro; uma consulta custa alguns microssegundos.
+#
+# O livro padrão (assets/livro/abertura.bin) é gerado a partir de
+# LINHAS_PADRAO:
+#   python opening_book.py
+# e um livro próprio sai de um arquivo com uma linha de lances UCI por linha:
+#   python opening_book.py --linhas minhas_linhas.txt --saida meu_livro.bin
+# Qualquer livro Polyglot de fora também serve (BotHandler(livro=...)).
+
+import os
+import random
+import time
+
+import chess
+import chess.polyglot
+
+# cada linha conta 1 no peso de cada lance dela: lances de várias linhas pesam mais
+LINHAS_PADRAO = (
+    # abertas
+    "e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6 e1g1 f8e7 f1e1 b7b5 a4b3 d7d6 c2c3 e8g8",
+    "e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6 e1g1 f6e4 d2d4 b7b5 a4b3 d7d5",
+    "e2e4 e7e5 g1f3 b8c6 f1b5 g8f6 e1g1 f6e4 d2d4 e4d6 b5c6 d7c6 d4e5 d6f5",
+    "e2e4 e7e5 g1f3 b8c6 f1c4 f8c5 c2c3 g8f6 d2d3 d7d6 e1g1 e8g8",
+    "e2e4 e7e5 g1f3 b8c6 f1c4 g8f6 d2d3 f8e7 e1g1 e8g8 f1e1 d7d6",
+    "e2e4 e7e5 g1f3 b8c6 d2d4 e5d4 f3d4 g8f6 d4c6 b7c6 e4e5 d8e7",
+    "e2e4 e7e5 g1f3 g8f6 f3e5 d7d6 e5f3 f6e4 d2d4 d6d5 f1d3",
+    "e2e4 e7e5 b1c3 g8f6 g1f3 b8c6 f1b5 f8b4 e1g1 e8g8",
+    "e2e4 e7e5 f2f4 e5f4 g1f3 g7g5 h2h4 g5g4 f3e5",
+    # sicilianas
+    "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6 c1e3 e7e5 d4b3 c8e6",
+    "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 g7g6 c1e3 f8g7 f2f3 e8g8",
+    "e2e4 c7c5 g1f3 b8c6 d2d4 c5d4 f3d4 g8f6 b1c3 e7e5 d4b5 d7d6 c1g5 a7a6",
+    "e2e4 c7c5 g1f3 e7e6 d2d4 c5d4 f3d4 a7a6 f1d3 g8f6 e1g1 d8c7",
+    "e2e4 c7c5 c2c3 g8f6 e4e5 f6d5 d2d4 c5d4 g1f3 b8c6",
+    # defesas semiabertas
+    "e2e4 e7e6 d2d4 d7d5 b1c3 g8f6 c1g5 f8e7 e4e5 f6d7 g5e7 d8e7",
+    "e2e4 e7e6 d2d4 d7d5 b1c3 f8b4 e4e5 c7c5 a2a3 b4c3 b2c3 g8e7",
+    "e2e4 e7e6 d2d4 d7d5 e4e5 c7c5 c2c3 b8c6 g1f3 d8b6",
+    "e2e4 c7c6 d2d4 d7d5 b1c3 d5e4 c3e4 c8f5 e4g3 f5g6 h2h4 h7h6",
+    "e2e4 c7c6 d2d4 d7d5 e4e5 c8f5 g1f3 e7e6 f1e2 c6c5",
+    "e2e4 d7d5 e4d5 d8d5 b1c3 d5a5 d2d4 g8f6 g1f3 c8f5",
+    "e2e4 d7d6 d2d4 g8f6 b1c3 g7g6 g1f3 f8g7 f1e2 e8g8 e1g1",
+    # peão da dama
+    "d2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7 e2e3 e8g8 g1f3 h7h6",
+    "d2d4 d7d5 c2c4 d5c4 g1f3 g8f6 e2e3 e7e6 f1c4 c7c5 e1g1 a7a6",
+    "d2d4 d7d5 c2c4 c7c6 g1f3 g8f6 b1c3 d5c4 a2a4 c8f5 e2e3 e7e6",
+    "d2d4 d7d5 g1f3 g8f6 c1f4 e7e6 e2e3 c7c5 c2c3 b8c6",
+    "d2d4 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6 g1f3 e8g8 f1e2 e7e5 e1g1 b8c6",
+    "d2d4 g8f6 c2c4 e7e6 b1c3 f8b4 e2e3 e8g8 f1d3 d7d5 g1f3 c7c5",
+    "d2d4 g8f6 c2c4 e7e6 g1f3 b7b6 g2g3 c8a6 b2b3 f8b4 c1d2 b4e7",
+    "d2d4 g8f6 c2c4 g7g6 b1c3 d7d5 c4d5 f6d5 e2e4 d5c3 b2c3 f8g7",
+    "d2d4 g8f6 c2c4 e7e6 g2g3 d7d5 f1g2 f8e7 g1f3 e8g8 e1g1",
+    "d2d4 f7f5 g2g3 g8f6 f1g2 g7g6 g1f3 f8g7 e1g1 e8g8 c2c4 d7d6",
+    # flanco
+    "c2c4 e7e5 b1c3 g8f6 g1f3 b8c6 g2g3 d7d5 c4d5 f6d5",
+    "c2c4 g8f6 b1c3 e7e6 g1f3 d7d5 d2d4 f8e7",
+    "g1f3 d7d5 g2g3 g8f6 f1g2 e7e6 e1g1 f8e7 d2d3 e8g8",
+)
+
+# peso mínimo para um lance do livro valer (0 = entrada apagada, como no Polyglot)
+PESO_MINIMO = 1
+
+
+def _lance_polyglot(board: chess.Board, move: chess.Move) -> int:
+    # o Polyglot grava o roque como "rei captura a própria torre" (e1h1)
+    destino = move.to_square
+    if board.is_castling(move):
+        coluna = 7 if board.is_kingside_castling(move) else 0
+        destino = chess.square(coluna, chess.square_rank(move.from_square))
+    promocao = move.promotion - 1 if move.promotion else 0
+    return destino | (move.from_square << 6) | (promocao << 12)
+
+
+def criar_livro(linhas, path) -> int:
+    """Grava um livro Polyglot com os lances das linhas (strings de lances UCI). Devolve o nº de entradas."""
+    pesos = {}
+    for n, linha in enumerate(linhas, 1):
+        board = chess.Board()
+        for uci in linha.split():
+            try:
+                move = board.push_uci(uci)
+            except ValueError:
+                raise ValueError(f"linha {n}: lance inválido '{uci}' em '{linha}'")
+            board.pop()
+            chave = (chess.polyglot.zobrist_hash(board), _lance_polyglot(board, move))
+            pesos[chave] = pesos.get(chave, 0) + 1
+            board.push(move)
+
+    pasta = os.path.dirname(path)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(path, "wb") as f:
+        for (chave, lance), peso in sorted(pesos.items()):
+            f.write(chess.polyglot.ENTRY_STRUCT.pack(chave, lance, min(peso, 0xFFFF), 0))
+    return len(pesos)
+
+
+def ler_linhas(path) -> list:
+    # uma linha de lances UCI por linha do arquivo; "#" começa comentário
+    linhas = []
+    with open(path, encoding="utf-8") as f:
+        for texto in f:
+            texto = texto.split("#", 1)[0].strip()
+            if texto:
+                linhas.append(texto)
+    return linhas
+
+
+class OpeningBook:
+    """
+    Consulta a um livro Polyglot mapeado em memória.
+
+    escolher() sorteia um dos lances do livro para a posição, com o peso
+    elevado a skill/10: no nível 0 todos os lances do livro são
+    igualmente prováveis, no 10 vale o peso do livro e no 20 a linha
+    principal domina. O bot também sai do livro mais cedo nos níveis
+    baixos (max_ply = ply_base + skill), deixando o motor (já com a força
+    limitada) jogar.
+    """
+
+    def __init__(self, path, ply_base=8, seed=None):
+        self.path = path
+        self.ply_base = ply_base
+        self.disponivel = False
+        self._reader = None
+        self._rng = random.Random(seed)
+
+        # estatísticas
+        self.consultas = 0
+        self.acertos = 0
+        self.tempos_us = []
+
+    def abrir(self) -> bool:
+        if self._reader is not None:
+            return True
+        if not self.path or not os.path.exists(self.path):
+            print(f"Aviso: livro de aberturas não encontrado em '{self.path}', o bot vai direto ao motor.")
+            return False
+        try:
+            self._reader = chess.polyglot.open_reader(self.path)
+        except Exception as e:
+            print("Erro abrindo o livro de aberturas:", self.path, e)
+            return False
+        self.disponivel = True
+        return True
+
+    def escolher(self, board: chess.Board, skill: int = 20):
+        """Lance do livro para board (chess.Move), ou None fora do livro."""
+        if not self.disponivel or board.ply() >= self.ply_base + skill:
+            return None
+        t0 = time.perf_counter()
+        self.consultas += 1
+        entradas = list(self._reader.find_all(board, minimum_weight=PESO_MINIMO))
+        move = None
+        if entradas:
+            expoente = max(0, min(20, skill)) / 10
+            pesos = [e.weight ** expoente for e in entradas]
+            move = self._rng.choices(entradas, weights=pesos)[0].move
+            self.acertos += 1
+        self.tempos_us.append((time.perf_counter() - t0) * 1e6)
+        return move
+
+    def stats(self) -> dict:
+        tempos = sorted(self.tempos_us)
+        return {
+            "entradas": len(self._reader) if self._reader is not None else 0,
+            "consultas": self.consultas,
+            "acertos": self.acertos,
+            "p50_us": round(tempos[len(tempos) // 2], 1) if tempos else None,
+            "max_us": round(tempos[-1], 1) if tempos else None,
+        }
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self.disponivel = False
+
+
+# ---------------- gerador e benchmark: python opening_book.py ----------------
+
+def _benchmark(path, partidas=200):
+    livro = OpeningBook(path, seed=0)
+    if not livro.abrir():
+        return
+    rng = random.Random(0)
+    lances = []
+    for _ in range(partidas):
+        board = chess.Board()
+        # as duas cores tiram do livro enquanto houver lance; skill variando
+        skill = rng.randint(0, 20)
+        while True:
+            move = livro.escolher(board, skill)
+            if move is None:
+                break
+            board.push(move)
+        lances.append(board.ply())
+    print(f"{partidas} partidas saindo do livro no lance (ply) p50 {sorted(lances)[len(lances) // 2]}, "
+          f"max {max(lances)}")
+    print(livro.stats())
+    livro.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    padrao = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "livro", "abertura.bin")
+    parser = argparse.ArgumentParser(description="Gera um livro de aberturas Polyglot e mede as consultas.")
+    parser.add_argument("--linhas", help="arquivo com uma linha de lances UCI por linha (padrão: LINHAS_PADRAO)")
+    parser.add_argument("--saida", default=padrao, help="arquivo .bin de saída")
+    args = parser.parse_args()
+    linhas = ler_linhas(args.linhas) if args.linhas else LINHAS_PADRAO
+    print(f"{criar_livro(linhas, args.saida)} entradas gravadas em {args.saida}")
+    _benchmark(args.saida)
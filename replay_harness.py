@@ -0,0 +1,214 @@
+# replay_harness.py
+#
+# Mede o caminho de voz sem microfone: toca WAVs gravados pelo mesmo
+# pipeline do main.py (VAD -> RecognizerWorker) e compara com a jogada
+# esperada de cada arquivo.
+#
+# Uso:
+#   python replay_harness.py gravacoes/manifesto.jsonl --velocidade 0
+#
+# O manifesto tem um JSON por linha:
+#   {"wav": "e2e4.wav", "jogada": "e2e4", "texto": "mover peão e dois para e quatro",
+#    "fen": "<opcional, padrão = posição inicial>"}
+# Caminhos de WAV relativos são resolvidos a partir da pasta do manifesto.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import chess
+
+from audio_frontend import AudioFrontEnd
+from audio_sources import WavFileSource
+from latency import percentil
+from vad import EnergyVAD
+from voice_commands import lista_vocabulario_xadrez
+from voice_recognizer import RecognizerWorker
+
+
+def erros_palavras(ref: list, hip: list) -> int:
+    # distância de edição por palavras (numerador do WER)
+    anterior = list(range(len(hip) + 1))
+    for i in range(1, len(ref) + 1):
+        atual = [i] + [0] * len(hip)
+        for j in range(1, len(hip) + 1):
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1,
+                           anterior[j - 1] + (ref[i - 1] != hip[j - 1]))
+        anterior = atual
+    return anterior[-1]
+
+
+def carregar_manifesto(path):
+    base = os.path.dirname(os.path.abspath(path))
+    itens = []
+    with open(path, encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            item = json.loads(linha)
+            if not os.path.isabs(item["wav"]):
+                item["wav"] = os.path.join(base, item["wav"])
+            itens.append(item)
+    return itens
+
+
+def esperar_marca(worker, ident, timeout):
+    # junta os resultados até o worker processar a marca
+    resultados = []
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        for msg in worker.poll():
+            if msg.get("tipo") == "marca" and msg.get("id") == ident:
+                return resultados, msg["t"]
+            if msg.get("tipo") == "resultado":
+                msg["t_recebido"] = time.monotonic()
+                resultados.append(msg)
+        time.sleep(0.001)
+    return resultados, None
+
+
+def rodar_enunciado(worker, vad, item, args, ident):
+    worker.set_position(item.get("fen", chess.STARTING_FEN))
+    if vad is not None:
+        vad.reset()
+
+    source = WavFileSource(item["wav"], chunk_frames=args.chunk, velocidade=args.velocidade)
+    source.start()
+    # mesmo pré-processamento do jogo; também converte WAVs gravados a 44.1/48 kHz
+    frontend = AudioFrontEnd(source.sample_rate, args.sample_rate, agc=not args.sem_agc)
+
+    resultados = []
+    try:
+        while True:
+            dados = source.read()
+            if not dados:
+                break
+            t = time.monotonic()
+            dados = frontend.process(dados)
+            if vad is None:
+                worker.feed(dados, t)
+            else:
+                for pcm, fim_de_fala in vad.process(dados):
+                    worker.feed(pcm, t)
+                    if fim_de_fala:
+                        worker.finalize(t)
+            for msg in worker.poll():
+                if msg.get("tipo") == "resultado":
+                    msg["t_recebido"] = time.monotonic()
+                    resultados.append(msg)
+    finally:
+        source.close()
+
+    # fim do arquivo = fim da fala: fecha a frase e espera o worker alcançar
+    t_fim_audio = time.monotonic()
+    worker.finalize(t_fim_audio)
+    worker.mark(ident)
+    resto, _ = esperar_marca(worker, ident, args.timeout)
+    resultados.extend(resto)
+
+    # a jogada do enunciado é o primeiro resultado com candidato
+    escolhido = next((r for r in resultados if r["candidatos"]), None)
+    if escolhido is None and resultados:
+        escolhido = resultados[-1]
+
+    linha = {
+        "wav": os.path.basename(item["wav"]),
+        "esperado": item.get("jogada"),
+        "obtido": escolhido["candidatos"][0].uci() if escolhido and escolhido["candidatos"] else None,
+        "texto": escolhido["texto"] if escolhido else "",
+        "parcial": bool(escolhido and escolhido.get("parcial")),
+        "latencia_decod_ms": None,
+        "latencia_fim_ms": None,
+        "erros_palavras": None,
+        "palavras_ref": None,
+    }
+    if escolhido is not None:
+        linha["latencia_decod_ms"] = (escolhido["t_decodificado"] - escolhido["t_audio"]) * 1000
+        # negativa quando a parcial confirmou a jogada antes do fim do áudio
+        linha["latencia_fim_ms"] = (escolhido["t_recebido"] - t_fim_audio) * 1000
+    if item.get("texto"):
+        ref = item["texto"].lower().split()
+        hip = linha["texto"].lower().split()
+        linha["erros_palavras"] = erros_palavras(ref, hip)
+        linha["palavras_ref"] = len(ref)
+    return linha
+
+
+def resumo(linhas, vad):
+    com_jogada = [l for l in linhas if l["esperado"]]
+    acertos = sum(1 for l in com_jogada if l["obtido"] == l["esperado"])
+    com_texto = [l for l in linhas if l["palavras_ref"]]
+    erros = sum(l["erros_palavras"] for l in com_texto)
+    palavras = sum(l["palavras_ref"] for l in com_texto)
+    decod = [l["latencia_decod_ms"] for l in linhas if l["latencia_decod_ms"] is not None]
+    fim = [l["latencia_fim_ms"] for l in linhas if l["latencia_fim_ms"] is not None]
+    r = {
+        "enunciados": len(linhas),
+        "acuracia_jogada": acertos / len(com_jogada) if com_jogada else None,
+        "wer": erros / palavras if palavras else None,
+        "latencia_decod_ms": {"p50": percentil(decod, 50), "p95": percentil(decod, 95),
+                              "media": statistics.mean(decod) if decod else None},
+        "latencia_fim_ms": {"p50": percentil(fim, 50), "p95": percentil(fim, 95),
+                            "media": statistics.mean(fim) if fim else None},
+    }
+    if vad is not None:
+        r["vad"] = vad.stats()
+    return r
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay de WAVs pelo pipeline de voz do xadrez.")
+    ap.add_argument("manifesto", help="arquivo .jsonl com wav/jogada/texto/fen")
+    ap.add_argument("--modelo", default="vosk-model-small-pt-0.3")
+    ap.add_argument("--sample-rate", type=int, default=16000)
+    ap.add_argument("--chunk", type=int, default=1024, help="frames por bloco lido do WAV")
+    ap.add_argument("--velocidade", type=float, default=1.0,
+                    help="1 = tempo real, 0 = o mais rápido possível")
+    ap.add_argument("--sem-vad", action="store_true")
+    ap.add_argument("--sem-agc", action="store_true", help="desliga o controle automático de ganho")
+    ap.add_argument("--sem-gramatica", action="store_true", help="desliga a gramática por posição")
+    ap.add_argument("--sem-parcial", action="store_true", help="só resultados finais")
+    ap.add_argument("--confirmacao-ms", type=int, default=150)
+    ap.add_argument("--alternativas", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=30.0, help="espera máxima pelo worker (s)")
+    ap.add_argument("--saida", help="grava o relatório completo em JSON")
+    args = ap.parse_args(argv)
+
+    itens = carregar_manifesto(args.manifesto)
+    worker = RecognizerWorker(args.modelo, args.sample_rate, grammar=lista_vocabulario_xadrez,
+                              gramatica_dinamica=not args.sem_gramatica,
+                              modo_parcial=not args.sem_parcial,
+                              confirmacao_ms=args.confirmacao_ms,
+                              max_alternativas=args.alternativas)
+    worker.start()
+    if not worker.wait_ready(timeout=120):
+        print("Não foi possível carregar o modelo.")
+        return 1
+    vad = None if args.sem_vad else EnergyVAD(sample_rate=args.sample_rate)
+
+    linhas = []
+    try:
+        for i, item in enumerate(itens):
+            linha = rodar_enunciado(worker, vad, item, args, i)
+            linhas.append(linha)
+            ok = "OK " if linha["obtido"] == linha["esperado"] else "ERR"
+            lat = linha["latencia_decod_ms"]
+            print(f"{ok} {linha['wav']:30s} esperado={linha['esperado']} obtido={linha['obtido']} "
+                  f"decod={'-' if lat is None else f'{lat:.0f}ms'} texto='{linha['texto']}'")
+    finally:
+        worker.stop()
+
+    r = resumo(linhas, vad)
+    print(json.dumps(r, indent=2, ensure_ascii=False))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"resumo": r, "enunciados": linhas}, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
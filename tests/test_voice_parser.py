@@ -0,0 +1,26 @@
+import chess
+
+from game_logic import LegalMoveIndex
+from voice_parser import parse_command, resolve_candidates
+
+
+def candidatos(texto, board=None):
+    board = board or chess.Board()
+    return [mv.uci() for mv in resolve_candidates(parse_command(texto), board, LegalMoveIndex(board))]
+
+
+def test_origem_e_destino_sem_peca():
+    assert candidatos("e dois para e quatro") == ["e2e4"]
+
+
+def test_peca_dita_confere_com_a_origem():
+    assert candidatos("mover peão e dois para e quatro") == ["e2e4"]
+    assert candidatos("mover cavalo e dois para e quatro") == []
+    assert candidatos("mover cavalo g um para f três") == ["g1f3"]
+    assert candidatos("mover bispo g um para f três") == []
+
+
+def test_roque_continua_valendo():
+    board = chess.Board("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    assert candidatos("roque", board) == ["e1g1"]
+    assert candidatos("roque grande", board) == ["e1c1"]
@@ -0,0 +1,99 @@
+import json
+
+import chess
+import pytest
+
+from voice_grammar import build_grammar, prefixos_estritos
+from voice_recognizer import RecognizerPool, RecognizerSession
+
+BLOCO = b"\0\0" * 1024   # 64 ms a 16 kHz
+
+
+class RecognizerFalso:
+    """KaldiRecognizer de mentira: devolve sempre a mesma parcial."""
+
+    def __init__(self):
+        self.parcial = ""
+        self.final = ""
+
+    def AcceptWaveform(self, pcm):
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": self.parcial})
+
+    def FinalResult(self):
+        return json.dumps({"text": self.final})
+
+    def Reset(self):
+        pass
+
+
+@pytest.fixture
+def sessao(monkeypatch):
+    rec = RecognizerFalso()
+    monkeypatch.setattr(RecognizerPool, "_criar", lambda self, grammar_json: rec)
+    s = RecognizerSession(model=None, max_alternativas=1, fuzzy=False)
+    s.recognizer_falso = rec
+    return s
+
+
+def falar(sessao, parcial, blocos=10):
+    sessao.recognizer_falso.parcial = parcial
+    for _ in range(blocos):
+        r = sessao.on_audio(0.0, BLOCO)
+        if r is not None:
+            return r
+    return None
+
+
+def test_prefixos_estritos():
+    prefixos = prefixos_estritos(["roque", "roque grande", "e dois para e quatro"])
+    assert "roque" in prefixos
+    assert "e dois para e" in prefixos
+    assert "roque grande" not in prefixos
+    assert "e dois para e quatro" not in prefixos
+
+
+def test_roque_nao_confirma_pela_parcial_com_roque_grande_legal(sessao):
+    sessao.on_posicao("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    assert falar(sessao, "roque") is None
+    sessao.recognizer_falso.final = "roque grande"
+    r = sessao.on_fim(0.0)
+    assert r["candidatos"] == [chess.Move.from_uci("e1c1")]
+    assert not r["parcial"]
+
+
+def test_roque_confirma_pela_parcial_sem_roque_grande(sessao):
+    sessao.on_posicao("4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+    r = falar(sessao, "roque")
+    assert r is not None and r["parcial"]
+    assert r["candidatos"] == [chess.Move.from_uci("e1g1")]
+
+
+def test_promocao_espera_a_peca(sessao):
+    sessao.on_posicao("7k/P7/8/8/8/8/8/4K3 w - - 0 1")
+    assert falar(sessao, "a sete para a oito") is None
+    assert falar(sessao, "peão a oito") is None
+    r = falar(sessao, "a sete para a oito promove cavalo")
+    assert r is not None and r["parcial"]
+    assert r["candidatos"] == [chess.Move.from_uci("a7a8n")]
+
+
+def test_frases_da_gramatica_sem_prefixo_confirmam(sessao):
+    sessao.on_posicao(chess.STARTING_FEN)
+    frases = build_grammar(chess.Board())
+    assert "e dois para e quatro" in frases
+    r = falar(sessao, "e dois para e quatro")
+    assert r["candidatos"] == [chess.Move.from_uci("e2e4")]
+
+
+def test_descartar_volta_a_aceitar_parciais(sessao):
+    sessao.on_posicao(chess.STARTING_FEN)
+    assert falar(sessao, "e dois para e quatro") is not None
+    # a interface não aplicou o lance: sem posição nova, a parcial fica bloqueada...
+    assert falar(sessao, "e dois para e quatro") is None
+    # ...até o descarte
+    sessao.on_descartar()
+    r = falar(sessao, "e dois para e quatro")
+    assert r is not None and r["parcial"]
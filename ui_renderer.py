@@ -5,6 +5,8 @@ import chess
 import math
 import time
 
+from move_announcer import MoveAnnouncer
+
 # dimensões e constantes
 LARGURA_TELA, ALTURA_TELA = 1024, 768
 LARGURA_TABULEIRO = 640
@@ -45,6 +47,7 @@ class UIRenderer:
         self.font_menu = pygame.font.Font(fonte_padrao, 56)
         self.font_relogio = pygame.font.Font(fonte_padrao, 36)
         self.font_label = pygame.font.Font(fonte_padrao, 18)
+        self.font_debug = pygame.font.SysFont("consolas,dejavusansmono,monospace", 14)
 
         # assets
         self.caminho_imagens = caminho_imagens
@@ -52,6 +55,7 @@ class UIRenderer:
         self.avatar_tamanho = (80,80)
         self.imagens_bot = {}
         self.imagem_jogador = None
+        self.anunciador = None
         self.load_images()
         self.load_sounds()
 
@@ -61,6 +65,8 @@ class UIRenderer:
 
         self.s_last = pygame.Surface((TAMANHO_QUADRADO, TAMANHO_QUADRADO), pygame.SRCALPHA)
         self.s_last.fill((255, 255, 0, 60))
+        self.s_premove = pygame.Surface((TAMANHO_QUADRADO, TAMANHO_QUADRADO), pygame.SRCALPHA)
+        self.s_premove.fill((255, 80, 80, 90))
 
         self.s_valid = pygame.Surface((TAMANHO_QUADRADO, TAMANHO_QUADRADO), pygame.SRCALPHA)
         self.s_valid.fill(COR_GLOW_VALIDO)
@@ -143,6 +149,19 @@ class UIRenderer:
         if board.is_check():
             self.play_sound('check')
 
+    def ativar_anuncios(self, pasta=None):
+        # clips de palavras em assets/sounds/voz (ver move_announcer.py)
+        self.anunciador = MoveAnnouncer(pasta or os.path.join(self.caminho_sons, "voz"))
+        return self.anunciador.carregar()
+
+    def announce_move(self, board):
+        # fala o último lance do tabuleiro ("cavalo para f três")
+        try:
+            if self.anunciador is not None:
+                self.anunciador.anunciar(board)
+        except Exception as e:
+            print("Erro ao anunciar lance:", e)
+
 
     # ------------------ utilitário: desenhar fundo animado ------------------
     def _draw_background_animation(self):
@@ -266,7 +285,7 @@ class UIRenderer:
 
     # ------------------- Desenho do tabuleiro, peças, destaques e painel -------------------
 
-    def draw_board(self, board: chess.Board, tabuleiro_invertido: bool, quadrado_selecionado, ultimo_mov):
+    def draw_board(self, board: chess.Board, tabuleiro_invertido: bool, quadrado_selecionado, ultimo_mov, premove=None):
         # fundo do tabuleiro
         self._draw_background_animation()
 
@@ -295,6 +314,12 @@ class UIRenderer:
                 r, c = self.get_pos_tela(q, tabuleiro_invertido)
                 self.screen.blit(self.s_last, (c * TAMANHO_QUADRADO, r * TAMANHO_QUADRADO))
 
+        # pré-movimento aguardando o lance do bot
+        if premove:
+            for q in [premove.from_square, premove.to_square]:
+                r, c = self.get_pos_tela(q, tabuleiro_invertido)
+                self.screen.blit(self.s_premove, (c * TAMANHO_QUADRADO, r * TAMANHO_QUADRADO))
+
         # seleção e movimentos válidos
         if quadrado_selecionado is not None:
             r, c = self.get_pos_tela(quadrado_selecionado, tabuleiro_invertido)
@@ -391,6 +416,31 @@ class UIRenderer:
 
         return desistir_rect
 
+    # ------------------ STATUS DA VOZ (menus) ------------------
+    def draw_status_voz(self, status):
+        textos = {
+            "carregando": ("Voz: carregando modelo...", (200, 200, 120)),
+            "pronto": ("Voz: pronta", COR_RELOGIO_ATIVO),
+            "indisponivel": ("Voz: indisponível", COR_BOTAO_DESISTIR),
+        }
+        texto, cor = textos.get(status, ("Voz: " + str(status), COR_TEXTO))
+        self.draw_text_center(texto, self.font_label, cor, (LARGURA_TELA//2, ALTURA_TELA - 30))
+
+    # ------------------ OVERLAY DE DEPURAÇÃO (latências) ------------------
+    def draw_overlay_latencia(self, linhas):
+        if not linhas:
+            return
+        superficies = [self.font_debug.render(l, True, (180, 255, 180)) for l in linhas]
+        largura = max(s.get_width() for s in superficies) + 12
+        altura = sum(s.get_height() for s in superficies) + 8
+        fundo = pygame.Surface((largura, altura), pygame.SRCALPHA)
+        fundo.fill((0, 0, 0, 170))
+        self.screen.blit(fundo, (4, 4))
+        y = 8
+        for s in superficies:
+            self.screen.blit(s, (10, y))
+            y += s.get_height()
+
     # ------------------ TELA DE FIM ------------------
     def draw_end_screen(self, resultado):
         s = pygame.Surface((LARGURA_TELA, ALTURA_TELA), pygame.SRCALPHA)
@@ -436,7 +486,8 @@ class UIRenderer:
     def handle_jogo_event(self, event, state, tabuleiro_invertido, cor_jogador, modo_jogo):
         """
         Recebe events do main loop e retorna:
-          - chess.Move (quando jogador completou movimento)
+          - chess.Move (quando jogador completou movimento; na vez do bot
+            é um pré-movimento, ainda não legal na posição atual)
           - "DESISTIR" (quando clicou desistir)
           - None (nada a fazer)
         Ele também trata a modal de promoção de forma não-bloqueante.
@@ -462,6 +513,10 @@ class UIRenderer:
             if desistir_rect.collidepoint(pos):
                 return "DESISTIR"
 
+            # na vez do bot os cliques montam um pré-movimento com as peças do jogador
+            premove = modo_jogo == "pvb" and cor_jogador is not None and state.board.turn != cor_jogador
+            cor_ativa = cor_jogador if premove else state.board.turn
+
             # clique no tabuleiro (área esquerda)
             if pos[0] <= LARGURA_TABULEIRO and pos[1] <= ALTURA_TABULEIRO:
                 tela_c, tela_r = pos[0] // (TAMANHO_QUADRADO), pos[1] // (TAMANHO_QUADRADO)
@@ -473,12 +528,15 @@ class UIRenderer:
                 # seleção / movimento
                 if not state.cliques_jogador:
                     p = state.board.piece_at(quadrado)
-                    if p and p.color == state.board.turn:
+                    if p and p.color == cor_ativa:
                         state.quadrado_selecionado = quadrado
                         state.cliques_jogador = [quadrado]
+                    elif premove:
+                        # clique fora das próprias peças cancela o pré-movimento
+                        state.premove = None
                 else:
                     p2 = state.board.piece_at(quadrado)
-                    if p2 and p2.color == state.board.turn:
+                    if p2 and p2.color == cor_ativa:
                         state.quadrado_selecionado = quadrado
                         state.cliques_jogador = [quadrado]
                     else:
@@ -487,13 +545,13 @@ class UIRenderer:
                         if state.board.piece_type_at(state.cliques_jogador[0]) == chess.PAWN and chess.square_rank(quadrado) in [0,7]:
                             # começar promoção não bloqueante
                             state.pending_promotion = {'from': state.cliques_jogador[0], 'to': quadrado}
-                            self.start_promotion(color_white=(state.board.turn == chess.WHITE))
+                            self.start_promotion(color_white=(cor_ativa == chess.WHITE))
                             # limpar seleção (aguardar escolha)
                             state.quadrado_selecionado = None
                             state.cliques_jogador = []
                             return None
                         # jogada normal
-                        if mv in state.board.legal_moves:
+                        if (state.premove_plausivel(mv) if premove else mv in state.board.legal_moves):
                             # reset seleção e retornar a jogada para main aplicar
                             state.quadrado_selecionado = None
                             state.cliques_jogador = []
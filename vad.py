@@ -0,0 +1,153 @@
+# vad.py
+
+from collections import deque
+
+import numpy as np
+
+
+class EnergyVAD:
+    """
+    Detector de atividade de voz por energia, colocado antes do reconhecedor.
+
+    O áudio é cortado em quadros de frame_ms; a energia RMS de todos os
+    quadros de um bloco é calculada de uma vez com NumPy e comparada com um
+    piso de ruído adaptativo. Só os trechos de fala (mais um pre-roll curto
+    antes e um hangover depois) seguem para o Vosk; o silêncio enquanto o
+    jogador pensa é descartado.
+
+    process() devolve uma lista de trechos (pcm, fim_de_fala). Quando
+    fim_de_fala é True o chamador deve pedir o resultado final ao
+    reconhecedor logo depois daquele trecho, já que o silêncio que o Kaldi
+    usaria para fechar a frase não chega até ele.
+
+    O piso aprende rápido com os quadros silenciosos e sobe devagar até o
+    mínimo das energias dos últimos janela_minimo_ms (estatística de
+    mínimos): entre as palavras a energia cai ao nível do ambiente, então
+    um ruído que aumenta de vez também é seguido. Uma fala que passa de
+    max_fala_ms é fechada à força (comandos de lance são curtos).
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, pre_roll_ms=300, hangover_ms=400,
+                 razao_inicio=3.0, razao_fim=2.0, energia_minima=150.0, adaptacao=0.05,
+                 janela_minimo_ms=1500, adaptacao_subida=0.01, max_fala_ms=6000):
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.frame_bytes = self.frame_len * 2
+        self.pre_roll_frames = max(0, pre_roll_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.razao_inicio = razao_inicio
+        self.razao_fim = razao_fim
+        self.energia_minima = energia_minima
+        self.adaptacao = adaptacao
+        self.adaptacao_subida = adaptacao_subida
+        self.max_fala_frames = max(1, max_fala_ms // frame_ms)
+
+        self.piso_ruido = None
+        self.falando = False
+        self._hangover = 0
+        self._frames_fala = 0
+        self._resto = b""
+        self._pre_roll = deque(maxlen=self.pre_roll_frames or None)
+        self._recentes = deque(maxlen=max(1, janela_minimo_ms // frame_ms))
+
+        # estatísticas
+        self.frames_total = 0
+        self.frames_encaminhados = 0
+        self.falas_cortadas = 0
+
+    def reset(self):
+        self.falando = False
+        self._hangover = 0
+        self._frames_fala = 0
+        self._resto = b""
+        self._pre_roll.clear()
+
+    @property
+    def fracao_descartada(self) -> float:
+        if self.frames_total == 0:
+            return 0.0
+        return 1.0 - self.frames_encaminhados / self.frames_total
+
+    def _energias(self, pcm: bytes) -> np.ndarray:
+        # RMS por quadro, vetorizado sobre o bloco inteiro
+        amostras = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        quadros = amostras.reshape(-1, self.frame_len)
+        return np.sqrt(np.mean(quadros * quadros, axis=1))
+
+    def _atualizar_piso(self, energias: np.ndarray, silenciosas: np.ndarray):
+        if silenciosas.size:
+            media = float(np.mean(silenciosas))
+            # equivalente a aplicar a média móvel exponencial quadro a quadro
+            peso = 1.0 - (1.0 - self.adaptacao) ** silenciosas.size
+            self.piso_ruido += peso * (media - self.piso_ruido)
+        # subida lenta até o mínimo recente, mesmo com todos os quadros "altos"
+        self._recentes.extend(energias.tolist())
+        minimo = min(self._recentes)
+        if minimo > self.piso_ruido:
+            peso = 1.0 - (1.0 - self.adaptacao_subida) ** energias.size
+            self.piso_ruido += peso * (minimo - self.piso_ruido)
+
+    def process(self, pcm: bytes):
+        dados = self._resto + pcm
+        n_quadros = len(dados) // self.frame_bytes
+        util = n_quadros * self.frame_bytes
+        self._resto = dados[util:]
+        if n_quadros == 0:
+            return []
+
+        energias = self._energias(dados[:util])
+        if self.piso_ruido is None:
+            self.piso_ruido = float(np.median(energias))
+        piso = max(self.piso_ruido, self.energia_minima / self.razao_inicio)
+        acima_inicio = energias > piso * self.razao_inicio
+        acima_fim = energias > piso * self.razao_fim
+
+        trechos = []
+        saida = []
+        encaminhados = 0
+        for i in range(n_quadros):
+            quadro = dados[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            if not self.falando:
+                if acima_inicio[i]:
+                    self.falando = True
+                    self._hangover = self.hangover_frames
+                    self._frames_fala = 1
+                    saida.extend(self._pre_roll)
+                    self._pre_roll.clear()
+                    saida.append(quadro)
+                elif self.pre_roll_frames:
+                    self._pre_roll.append(quadro)
+            else:
+                saida.append(quadro)
+                self._frames_fala += 1
+                if acima_fim[i]:
+                    self._hangover = self.hangover_frames
+                else:
+                    self._hangover -= 1
+                longa = self._frames_fala >= self.max_fala_frames
+                if self._hangover <= 0 or longa:
+                    if longa and self._hangover > 0:
+                        self.falas_cortadas += 1
+                    self.falando = False
+                    self._frames_fala = 0
+                    trechos.append((b"".join(saida), True))
+                    encaminhados += len(saida)
+                    saida = []
+
+        # a média rápida só aprende com quadros que não parecem fala
+        self._atualizar_piso(energias, energias[~acima_fim])
+
+        if saida:
+            trechos.append((b"".join(saida), False))
+            encaminhados += len(saida)
+        self.frames_total += n_quadros
+        self.frames_encaminhados += encaminhados
+        return trechos
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames_total,
+            "encaminhados": self.frames_encaminhados,
+            "fracao_descartada": round(self.fracao_descartada, 3),
+            "piso_ruido": round(self.piso_ruido or 0.0, 1),
+            "falas_cortadas": self.falas_cortadas,
+        }
@@ -0,0 +1,94 @@
+# voice_channel.py
+
+from audio_capture import AudioCapture
+from audio_sources import abrir_fonte
+from vad import EnergyVAD
+from voice_recognizer import RecognizerWorker
+from voice_turn import TurnGate
+
+
+class VoiceChannel:
+    """
+    Um caminho de voz completo: fonte de áudio -> AudioCapture -> VAD ->
+    RecognizerWorker, com o TurnGate decidindo quando ele ouve.
+
+    cor=None aceita lances de quem estiver com a vez (um microfone só);
+    cor=chess.WHITE/BLACK prende o canal a um lado, para o PvP com dois
+    microfones: cada jogador tem a própria captura e o próprio processo
+    reconhecedor, e o canal do lado que não está com a vez fica pausado.
+    """
+
+    def __init__(self, nome, fonte, model_path, cor=None, sample_rate=16000, chunk_frames=1024,
+                 buffer_segundos=4.0, remover_dc=True, agc=True, grammar=None, opcoes_reconhecedor=None,
+                 latencias=None):
+        self.nome = nome
+        self.cor = cor
+        self.reconhecedor = RecognizerWorker(model_path, sample_rate, grammar=grammar,
+                                             **(opcoes_reconhecedor or {}))
+        self.capture = AudioCapture(sample_rate=sample_rate,
+                                    chunk_frames=chunk_frames,
+                                    buffer_segundos=buffer_segundos,
+                                    source=abrir_fonte(fonte, sample_rate, chunk_frames),
+                                    remover_dc=remover_dc, agc=agc)
+        self.vad = EnergyVAD(sample_rate=sample_rate)
+        self.turno = TurnGate(self.capture, self.vad, self.reconhecedor, sample_rate=sample_rate,
+                              latencias=latencias)
+        self.status = "desligado"   # desligado, carregando, pronto, indisponivel
+        self._fen = None
+
+    def start(self):
+        # os dois carregam em segundo plano; atualizar_status() acompanha
+        self.reconhecedor.start()
+        self.capture.start_em_segundo_plano()
+        self.status = "carregando"
+
+    def atualizar_status(self):
+        if self.status != "carregando":
+            return
+        if self.reconhecedor.status == "erro" or self.capture.status == "erro":
+            print(f"Ocorreu um erro ao inicializar o áudio ({self.nome}): "
+                  f"{self.reconhecedor.erro or self.capture.erro}")
+            # desabilita só este canal
+            self.capture.close()
+            self.reconhecedor.stop()
+            self.status = "indisponivel"
+        elif self.reconhecedor.status == "pronto" and self.capture.status == "pronto":
+            print(f">>> Ouvindo para comandos de voz ({self.nome})...")
+            self.status = "pronto"
+
+    @property
+    def pronto(self) -> bool:
+        return self.status == "pronto"
+
+    def aceita(self, cor) -> bool:
+        return self.cor is None or self.cor == cor
+
+    def set_position(self, fen: str):
+        # só manda quando muda
+        if fen != self._fen:
+            self.reconhecedor.set_position(fen)
+            self._fen = fen
+
+    def processar(self, deve_ouvir: bool, t_evento: float = None):
+        if not self.pronto:
+            return
+        self.turno.atualizar(deve_ouvir, t_evento)
+        self.turno.processar_audio()
+
+    def descartar(self):
+        # joga fora a frase em andamento e volta a aceitar parciais
+        self.reconhecedor.discard()
+
+    def poll(self) -> list:
+        return self.turno.filtrar(self.reconhecedor.poll())
+
+    def stats(self) -> dict:
+        return {
+            "captura": self.capture.stats(),
+            "vad": self.vad.stats(),
+            "turno": self.turno.stats(),
+        }
+
+    def close(self):
+        self.capture.close()
+        self.reconhecedor.stop()
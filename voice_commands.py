@@ -0,0 +1,39 @@
+# voice_commands.py
+
+import chess
+
+from voice_parser import parse_move
+
+# Crie esta lista no início do seu código, antes de inicializar o Vosk.
+
+lista_vocabulario_xadrez = [
+    # Comandos
+    "mover", "mova", "jogar", "para", "captura", "roque", "grande", "promove",
+
+    # Peças
+    "peão", "torre", "cavalo", "bispo", "rainha", "dama", "rei",
+
+    # Casas (escritas como falamos para maior precisão)
+    "a um", "a dois", "a três", "a quatro", "a cinco", "a seis", "a sete", "a oito",
+    "b um", "b dois", "b três", "b quatro", "b cinco", "b seis", "b sete", "b oito",
+    "c um", "c dois", "c três", "c quatro", "c cinco", "c seis", "c sete", "c oito",
+    "d um", "d dois", "d três", "d quatro", "d cinco", "d seis", "d sete", "d oito",
+    "e um", "e dois", "e três", "e quatro", "e cinco", "e seis", "e sete", "e oito",
+    "f um", "f dois", "f três", "f quatro", "f cinco", "f seis", "f sete", "f oito",
+    "g um", "g dois", "g três", "g quatro", "g cinco", "g seis", "g sete", "g oito",
+    "h um", "h dois", "h três", "h quatro", "h cinco", "h seis", "h sete", "h oito",
+
+    "[unk]"
+]
+def parse_voice_command(text: str, board: chess.Board = None, indice=None) -> chess.Move | None:
+    """
+    Interpreta o texto reconhecido, que pode conter números por extenso
+    (ex: "dois"), e tenta extrair um movimento de xadrez.
+    Retorna um objeto chess.Move ou None.
+
+    O trabalho é feito pelo autômato de voice_parser, montado uma vez na
+    importação. Com o tabuleiro, resolve também roque e promoção; com o
+    LegalMoveIndex da posição, resolve comandos só com peça e destino
+    (ex: "cavalo f três") quando houver uma única jogada possível.
+    """
+    return parse_move(text, board, indice)
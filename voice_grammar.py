@@ -0,0 +1,106 @@
+# voice_grammar.py
+
+import json
+from collections import OrderedDict
+
+import chess
+
+NOMES_PECAS = {
+    chess.PAWN: "peão", chess.KNIGHT: "cavalo", chess.BISHOP: "bispo",
+    chess.ROOK: "torre", chess.QUEEN: "rainha", chess.KING: "rei",
+}
+NUMEROS_FALADOS = ["um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito"]
+
+
+def nome_casa(square: int) -> str:
+    # 12 -> "e dois"
+    return f"{chess.FILE_NAMES[chess.square_file(square)]} {NUMEROS_FALADOS[chess.square_rank(square)]}"
+
+
+def position_key(board: chess.Board) -> str:
+    # peças, vez, roque e en passant: tudo o que define as jogadas legais
+    return board.epd()
+
+
+def frases_para_jogada(board: chess.Board, move: chess.Move) -> list:
+    """
+    Frases faladas que levam a esta jogada, no formato aceito por
+    parse_voice_command (ex: "mover peão e dois para e quatro").
+    """
+    peca = board.piece_type_at(move.from_square)
+    origem, destino = nome_casa(move.from_square), nome_casa(move.to_square)
+    frases = [f"mover {NOMES_PECAS[peca]} {origem} para {destino}", f"{origem} para {destino}",
+              f"{NOMES_PECAS[peca]} {destino}"]
+    if move.promotion is not None and move.promotion != chess.QUEEN:
+        # sem peça dita a promoção é para dama; as outras precisam ser faladas
+        sufixo = f" promove {NOMES_PECAS[move.promotion]}"
+        frases = [f + sufixo for f in frases]
+    if board.is_castling(move):
+        frases.append("roque grande" if board.is_queenside_castling(move) else "roque")
+    return frases
+
+
+def build_grammar(board: chess.Board) -> list:
+    frases = []
+    vistas = set()
+    for mv in board.legal_moves:
+        for frase in frases_para_jogada(board, mv):
+            # promoções geram a mesma frase para as quatro peças
+            if frase not in vistas:
+                vistas.add(frase)
+                frases.append(frase)
+    frases.append("[unk]")
+    return frases
+
+
+def prefixos_estritos(frases) -> frozenset:
+    """
+    Começos de frase que ainda podem continuar em outra frase da lista
+    ("roque" de "roque grande", "a sete para a oito" de "... promove
+    cavalo"). Uma parcial com um desses textos não está terminada.
+    """
+    prefixos = set()
+    for frase in frases:
+        palavras = frase.split()
+        for n in range(1, len(palavras)):
+            prefixos.add(" ".join(palavras[:n]))
+    return frozenset(prefixos)
+
+
+class GrammarCache:
+    """
+    Gramáticas do Vosk restritas às jogadas legais, guardadas por posição.
+    Posições repetidas (aberturas comuns, repetições) não são reconstruídas.
+    Junto com cada gramática ficam os prefixos estritos das frases dela.
+    """
+
+    def __init__(self, max_posicoes=256):
+        self.max_posicoes = max_posicoes
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def grammar_json(self, board: chess.Board) -> str:
+        return self._entrada(board)[0]
+
+    def prefixos(self, board: chess.Board) -> frozenset:
+        # mesma entrada da gramática; não conta nas estatísticas
+        return self._entrada(board, contar=False)[1]
+
+    def _entrada(self, board: chess.Board, contar=True) -> tuple:
+        chave = position_key(board)
+        entrada = self._cache.get(chave)
+        if entrada is not None:
+            if contar:
+                self.hits += 1
+            self._cache.move_to_end(chave)
+            return entrada
+
+        if contar:
+            self.misses += 1
+        frases = build_grammar(board)
+        entrada = (json.dumps(frases, ensure_ascii=False), prefixos_estritos(frases[:-1]))
+        self._cache[chave] = entrada
+        if len(self._cache) > self.max_posicoes:
+            self._cache.popitem(last=False)
+        return entrada
@@ -0,0 +1,148 @@
+# voice_matcher.py
+
+import unicodedata
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+import chess
+
+from voice_grammar import frases_para_jogada, position_key
+
+MatchResult = namedtuple("MatchResult", "move custo margem")
+
+# custos das operações sobre palavras
+CUSTO_INSERCAO = 0.6   # palavra a mais na transcrição (ruído, "mover" dito à toa)
+CUSTO_REMOCAO = 1.0    # palavra da frase esperada que não foi ouvida
+
+
+def normalizar(palavra: str) -> str:
+    # "três" -> "tres": o reconhecedor nem sempre acerta o acento
+    decomposta = unicodedata.normalize("NFD", palavra.lower())
+    return "".join(c for c in decomposta if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=4096)
+def custo_substituicao(a: str, b: str) -> float:
+    """
+    Distância de edição por caracteres, normalizada para [0, 1].
+    "atras" x "atres" custa pouco; "cavalo" x "torre" custa quase 1.
+    """
+    if a == b:
+        return 0.0
+    n, m = len(a), len(b)
+    anterior = list(range(m + 1))
+    for i in range(1, n + 1):
+        atual = [i] + [0] * m
+        for j in range(1, m + 1):
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1,
+                           anterior[j - 1] + (a[i - 1] != b[j - 1]))
+        anterior = atual
+    return anterior[m] / max(n, m)
+
+
+class _No:
+    __slots__ = ("filhos", "moves")
+
+    def __init__(self):
+        self.filhos = {}
+        self.moves = []
+
+
+class _TriePosicao:
+    """Trie com as sequências de palavras de todas as jogadas legais."""
+
+    def __init__(self, board: chess.Board):
+        self.raiz = _No()
+        for mv in board.legal_moves:
+            for frase in frases_para_jogada(board, mv):
+                no = self.raiz
+                for palavra in frase.split():
+                    no = no.filhos.setdefault(normalizar(palavra), _No())
+                if mv not in no.moves:
+                    no.moves.append(mv)
+
+
+class FuzzyMoveMatcher:
+    """
+    Casa transcrições ruidosas ("cavalo f atrás") com a forma falada das
+    jogadas legais por distância de edição ponderada sobre palavras.
+
+    A busca desce a trie da posição calculando uma linha da tabela de
+    programação dinâmica por nó; ramos cujo menor custo já passa do
+    segundo melhor encontrado são podados. Além de inserir, remover e
+    trocar palavras, a tabela aceita que uma casa (letra + número) seja
+    ouvida como uma palavra só ("a três" ouvido como "atrás").
+
+    As tries ficam em cache por posição, então o custo de montá-las é
+    pago uma vez por lance.
+    """
+
+    def __init__(self, max_posicoes=64, custo_maximo=2.5):
+        self.max_posicoes = max_posicoes
+        self.custo_maximo = custo_maximo
+        self._tries = OrderedDict()
+
+    def _trie(self, board: chess.Board) -> _TriePosicao:
+        chave = position_key(board)
+        trie = self._tries.get(chave)
+        if trie is None:
+            trie = _TriePosicao(board)
+            self._tries[chave] = trie
+            if len(self._tries) > self.max_posicoes:
+                self._tries.popitem(last=False)
+        else:
+            self._tries.move_to_end(chave)
+        return trie
+
+    def match(self, texto: str, board: chess.Board):
+        """
+        Devolve MatchResult(move, custo, margem) para a jogada mais próxima,
+        ou None. margem é a diferença para a segunda jogada mais próxima
+        (inf se não houver outra abaixo de custo_maximo).
+        """
+        q = [normalizar(p) for p in texto.split() if p != "[unk]"]
+        if not q:
+            return None
+        m = len(q)
+        trie = self._trie(board)
+
+        # melhor custo por jogada (uma jogada tem várias frases)
+        melhores = {}
+        limite = [self.custo_maximo]
+
+        def atualizar_limite():
+            custos = sorted(melhores.values())
+            # poda pelo segundo melhor: ele define a margem
+            segundo = custos[1] if len(custos) > 1 else self.custo_maximo
+            limite[0] = min(self.custo_maximo, segundo)
+
+        linha_raiz = [j * CUSTO_INSERCAO for j in range(m + 1)]
+        pilha = [(trie.raiz, None, linha_raiz, None)]
+        while pilha:
+            no, palavra_pai, linha_pai, linha_avo = pilha.pop()
+            for palavra, filho in no.filhos.items():
+                linha = [linha_pai[0] + CUSTO_REMOCAO] + [0.0] * m
+                # casa dita numa palavra só: só vale para letra + número
+                juntas = palavra_pai + palavra if palavra_pai is not None and len(palavra_pai) == 1 else None
+                for j in range(1, m + 1):
+                    melhor = min(linha_pai[j] + CUSTO_REMOCAO,
+                                 linha[j - 1] + CUSTO_INSERCAO,
+                                 linha_pai[j - 1] + custo_substituicao(palavra, q[j - 1]))
+                    if juntas is not None:
+                        melhor = min(melhor, linha_avo[j - 1] + custo_substituicao(juntas, q[j - 1]))
+                    linha[j] = melhor
+
+                if len(filho.moves) == 1 and linha[m] < self.custo_maximo:
+                    mv = filho.moves[0]
+                    if linha[m] < melhores.get(mv, float("inf")):
+                        melhores[mv] = linha[m]
+                        atualizar_limite()
+                if filho.filhos and min(linha) < limite[0]:
+                    pilha.append((filho, palavra, linha, linha_pai))
+
+        if not melhores:
+            return None
+        ordenados = sorted(melhores.items(), key=lambda kv: kv[1])
+        mv, custo = ordenados[0]
+        margem = ordenados[1][1] - custo if len(ordenados) > 1 else float("inf")
+        return MatchResult(mv, custo, margem)
@@ -0,0 +1,256 @@
+# voice_parser.py
+
+from collections import namedtuple
+
+import chess
+
+# ---------------- tabela de palavras (montada uma vez, na importação) ----------------
+
+LETRA, NUMERO, CASA, PECA, PARA, CAPTURA, ROQUE, LADO, PROMOCAO, IGNORAR = range(10)
+
+_PALAVRAS = {
+    # verbos e conectivos que não mudam o sentido
+    IGNORAR: ["mover", "mova", "move", "jogar", "joga", "jogo", "de", "do", "da", "o", "no", "na", "[unk]"],
+    PARA: ["para", "pra", "pro", "até"],
+    CAPTURA: ["captura", "capturar", "come", "comer", "toma", "tomar", "x", "por"],
+    ROQUE: ["roque", "roc"],
+    PROMOCAO: ["promove", "promover", "promoção", "promocao", "coroa", "coroar", "vira"],
+}
+_LADOS = {"grande": "grande", "maior": "grande", "longo": "grande",
+          "pequeno": "pequeno", "menor": "pequeno", "curto": "pequeno"}
+_PECAS = {
+    "peão": chess.PAWN, "peao": chess.PAWN,
+    "cavalo": chess.KNIGHT,
+    "bispo": chess.BISHOP,
+    "torre": chess.ROOK,
+    "rainha": chess.QUEEN, "dama": chess.QUEEN,
+    "rei": chess.KING,
+}
+_LETRAS = {
+    "a": 0, "b": 1, "c": 2, "d": 3, "e": 4, "f": 5, "g": 6, "h": 7,
+    "bê": 1, "be": 1, "cê": 2, "ce": 2, "dê": 3, "de": 3, "é": 4, "efe": 5,
+    "éfe": 5, "gê": 6, "ge": 6, "agá": 7, "aga": 7,
+}
+_NUMEROS = {
+    "um": 0, "uma": 0, "dois": 1, "duas": 1, "três": 2, "tres": 2, "quatro": 3,
+    "cinco": 4, "seis": 5, "sete": 6, "oito": 7,
+}
+
+
+def _montar_tabela():
+    tabela = {}
+    for tipo, palavras in _PALAVRAS.items():
+        for p in palavras:
+            tabela[p] = (tipo, None)
+    for p, lado in _LADOS.items():
+        tabela[p] = (LADO, lado)
+    for p, peca in _PECAS.items():
+        tabela[p] = (PECA, peca)
+    for p, f in _LETRAS.items():
+        # "de" é conectivo, mas também pode ser a letra d; vira letra e o
+        # autômato ignora se não vier número depois
+        tabela[p] = (LETRA, f)
+    for p, r in _NUMEROS.items():
+        tabela[p] = (NUMERO, r)
+    for r in range(8):
+        tabela[str(r + 1)] = (NUMERO, r)
+    # casas escritas juntas ("e4"), caso o modelo devolva assim
+    for sq in chess.SQUARES:
+        tabela[chess.square_name(sq)] = (CASA, sq)
+    return tabela
+
+
+TABELA = _montar_tabela()
+
+VoiceCommand = namedtuple("VoiceCommand", "peca origem destino captura promocao roque")
+
+
+def tokenize(text: str) -> list:
+    # palavras fora da tabela são descartadas (ruído do reconhecedor)
+    tokens = []
+    for palavra in text.lower().split():
+        tok = TABELA.get(palavra)
+        if tok is not None:
+            tokens.append(tok)
+    return tokens
+
+
+def parse_tokens(tokens: list):
+    """
+    Autômato sobre os tokens. Devolve um VoiceCommand ou None.
+
+    Aceita, por exemplo:
+      "mover peão e dois para e quatro", "e dois e quatro", "cavalo f três",
+      "bispo captura c seis", "roque", "roque grande",
+      "a sete para a oito promove cavalo"
+    """
+    peca = None
+    casas = []
+    captura = False
+    promocao = None
+    roque = None
+    letra_pendente = None
+    esperando_promocao = False
+
+    for tipo, valor in tokens:
+        if tipo == NUMERO:
+            if letra_pendente is not None:
+                casas.append(chess.square(letra_pendente, valor))
+            letra_pendente = None
+            continue
+        if tipo == LETRA:
+            # "a" logo após "promove" é preposição ("promove a dama")
+            if not esperando_promocao:
+                letra_pendente = valor
+            continue
+
+        letra_pendente = None
+        if tipo == CASA:
+            casas.append(valor)
+        elif tipo == PECA:
+            if esperando_promocao:
+                promocao = valor
+                esperando_promocao = False
+            elif peca is None and not casas:
+                peca = valor
+            elif casas and promocao is None:
+                # "a sete a oito cavalo": peça depois das casas indica promoção
+                promocao = valor
+        elif tipo == CAPTURA:
+            captura = True
+        elif tipo == PROMOCAO:
+            esperando_promocao = True
+        elif tipo == ROQUE:
+            roque = roque or "pequeno"
+        elif tipo == LADO:
+            if roque is not None:
+                roque = valor
+
+    if roque is not None and not casas:
+        return VoiceCommand(chess.KING, None, None, False, None, roque)
+    if not casas or len(casas) > 2:
+        return None
+    if promocao in (chess.PAWN, chess.KING):
+        return None
+    origem = casas[0] if len(casas) == 2 else None
+    return VoiceCommand(peca, origem, casas[-1], captura, promocao, None)
+
+
+def parse_command(text: str):
+    return parse_tokens(tokenize(text))
+
+
+def resolve_command(cmd, board: chess.Board = None):
+    """
+    Converte um VoiceCommand em chess.Move. Sem tabuleiro só resolve
+    comandos com origem e destino; com tabuleiro resolve também o roque e
+    escolhe a promoção certa para peões.
+    """
+    if cmd is None:
+        return None
+
+    if cmd.roque is not None:
+        if board is None:
+            return None
+        rei = board.king(board.turn)
+        if rei is None:
+            return None
+        arquivo = 6 if cmd.roque == "pequeno" else 2
+        return chess.Move(rei, chess.square(arquivo, chess.square_rank(rei)))
+
+    if cmd.origem is None:
+        return None
+
+    promocao = cmd.promocao
+    destino_rank = chess.square_rank(cmd.destino)
+    if promocao is None and destino_rank in (0, 7):
+        if board is not None:
+            if board.piece_type_at(cmd.origem) == chess.PAWN:
+                promocao = chess.QUEEN
+        elif cmd.peca in (None, chess.PAWN) and abs(destino_rank - chess.square_rank(cmd.origem)) == 1:
+            # sem tabuleiro, assume dama quando pode ser um peão chegando na última fileira
+            promocao = chess.QUEEN
+    if promocao is not None and board is not None and board.piece_type_at(cmd.origem) != chess.PAWN:
+        promocao = None
+    return chess.Move(cmd.origem, cmd.destino, promotion=promocao)
+
+
+def resolve_candidates(cmd, board: chess.Board, indice) -> list:
+    """
+    Todas as jogadas legais compatíveis com o comando, usando o
+    LegalMoveIndex da posição. Lista com mais de uma jogada = ambíguo.
+    """
+    if cmd is None:
+        return []
+    if cmd.origem is not None or cmd.roque is not None:
+        mv = resolve_command(cmd, board)
+        if mv is None or mv not in indice:
+            return []
+        # peça dita tem de ser a que está na origem ("cavalo e dois para e quatro" não é e2e4)
+        if cmd.peca is not None and board.piece_type_at(mv.from_square) != cmd.peca:
+            return []
+        return [mv]
+
+    moves = indice.lookup(cmd.destino, cmd.peca, cmd.promocao)
+    if cmd.captura and len(moves) > 1:
+        moves = [mv for mv in moves if board.is_capture(mv)]
+    return moves
+
+
+def parse_move(text: str, board: chess.Board = None, indice=None):
+    cmd = parse_command(text)
+    if indice is None or board is None:
+        return resolve_command(cmd, board)
+    moves = resolve_candidates(cmd, board, indice)
+    return moves[0] if len(moves) == 1 else None
+
+
+# ---------------- benchmark: python voice_parser.py ----------------
+
+def _parse_regex_legado(text):
+    # versão antiga de parse_voice_command (regex recompilada a cada chamada),
+    # mantida só para comparação
+    import re
+    numeros_por_extenso = {
+        "um": "1", "dois": "2", "três": "3", "quatro": "4",
+        "cinco": "5", "seis": "6", "sete": "7", "oito": "8"
+    }
+    numeros_regex = "|".join(numeros_por_extenso.keys())
+    padrao = re.compile(
+        r"mover .* ([a-h]) (" + numeros_regex + r") para ([a-h]) (" + numeros_regex + r")",
+        re.IGNORECASE
+    )
+    match = padrao.search(text)
+    if not match:
+        return None
+    lo, no, ld, nd = match.groups()
+    do, dd = numeros_por_extenso.get(no.lower()), numeros_por_extenso.get(nd.lower())
+    uci = f"{lo}{do}{ld}{dd}"
+    if (do == '7' and dd == '8') or (do == '2' and dd == '1'):
+        uci += 'q'
+    try:
+        return chess.Move.from_uci(uci)
+    except ValueError:
+        return None
+
+
+def _benchmark(n=20000):
+    import time
+    frases = [
+        "mover peão e dois para e quatro",
+        "mover cavalo g um para f três",
+        "mover bispo f um para c quatro",
+        "mover torre a um para a oito",
+        "[unk] mover rainha d um para h cinco",
+        "alguma coisa sem jogada",
+    ]
+    for nome, fn in (("regex (antigo)", _parse_regex_legado), ("tabela + autômato", parse_move)):
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(frases[i % len(frases)])
+        dt = time.perf_counter() - t0
+        print(f"{nome:20s} {n / dt:10.0f} frases/s  ({dt / n * 1e6:.2f} us/frase)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,445 @@
+# voice_recognizer.py
+
+import hashlib
+import json
+import queue
+import time
+from collections import OrderedDict
+from multiprocessing import Process, Queue
+
+import chess
+
+from game_logic import LegalMoveIndex
+from voice_matcher import FuzzyMoveMatcher
+from voice_parser import parse_command, resolve_candidates
+from voice_grammar import GrammarCache, build_grammar, prefixos_estritos
+
+
+class RecognizerWorker:
+    """
+    Processo separado que é dono do vosk.Model e do KaldiRecognizer.
+
+    O processo da interface só manda blocos PCM (feed) e recolhe os
+    resultados (poll); a decodificação do Kaldi roda em outro núcleo e
+    não trava mais o frame do pygame.
+
+    Mensagens de entrada (audio_q):
+      - ("audio", t_captura, pcm_bytes)
+      - ("fim", t_captura): fim de fala detectado pelo VAD, força o resultado final
+      - ("posicao", fen): posição atual, usada para validar as parciais e
+        para montar a gramática das jogadas legais
+      - ("descartar",): joga fora a frase em andamento sem gerar resultado
+        (troca de turno: o que foi dito antes não vale para o próximo lance)
+        e volta a aceitar parciais (a interface não aplicou a jogada da última)
+      - ("marca", id): devolvida como {"tipo": "marca", "id": id} quando o worker
+        chega nela (sincronização para testes e benchmarks)
+      - None para encerrar
+    Mensagens de saída (result_q): dicts com a chave "tipo":
+      - {"tipo": "pronto"} / {"tipo": "erro", "msg": ...}
+      - {"tipo": "resultado", "texto": ..., "candidatos": [chess.Move, ...],
+         "alternativas": [índice no N-best de cada candidato],
+         "ambiguas": [chess.Move, ...] (comando curto com mais de uma jogada), "parcial": bool,
+         "aproximado": bool (veio do casamento aproximado),
+         "t_audio": t do último bloco usado, "t_worker": t em que o worker tirou
+         esse bloco da fila, "t_aceito": t do fim do AcceptWaveform/FinalResult,
+         "t_decodificado": t do fim da interpretação}
+       todos os instantes são time.monotonic(), comparáveis entre os processos
+    """
+
+    def __init__(self, model_path, sample_rate=16000, grammar=None, gramatica_dinamica=True,
+                 modo_parcial=True, confirmacao_ms=150, max_alternativas=5):
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.grammar = grammar
+        # opções repassadas para a RecognizerSession dentro do worker
+        self.opcoes = {"gramatica_dinamica": gramatica_dinamica,
+                       "modo_parcial": modo_parcial, "confirmacao_ms": confirmacao_ms,
+                       "max_alternativas": max_alternativas}
+        self.available = False
+        self.status = "desligado"   # desligado, carregando, pronto, erro
+        self.erro = None
+        self._process = None
+        self._audio_q = None
+        self._result_q = None
+
+    # ----- lado do processo da interface -----
+
+    def start(self):
+        """
+        Inicia o processo sem esperar o modelo carregar. O aviso de
+        "pronto" (ou "erro") chega por poll(), que atualiza self.status.
+        """
+        self._audio_q = Queue()
+        self._result_q = Queue()
+        grammar_json = json.dumps(self.grammar, ensure_ascii=False) if self.grammar else None
+        p = Process(target=RecognizerWorker._worker_process,
+                    args=(self._audio_q, self._result_q, self.model_path, self.sample_rate,
+                          grammar_json, self.opcoes),
+                    daemon=True)
+        p.start()
+        self._process = p
+        self.status = "carregando"
+
+    def wait_ready(self, timeout=None) -> bool:
+        """
+        Bloqueia até o modelo carregar (útil fora do loop do jogo).
+        Retorna True se o reconhecedor ficou pronto.
+        """
+        if self.status == "carregando":
+            try:
+                self._on_status(self._result_q.get(timeout=timeout))
+            except queue.Empty:
+                print("Reconhecedor de voz não respondeu a tempo.")
+                self.stop()
+        return self.status == "pronto"
+
+    def _on_status(self, msg):
+        if msg.get("tipo") == "pronto":
+            self.status = "pronto"
+            self.available = True
+        elif msg.get("tipo") == "erro":
+            print("Erro no processo do reconhecedor:", msg.get("msg"))
+            self.erro = msg.get("msg")
+            self.stop()
+            self.status = "erro"
+
+    def feed(self, pcm: bytes, t_captura: float = None):
+        # não bloqueia: multiprocessing.Queue usa uma thread alimentadora para o pipe
+        if not self.available or not pcm:
+            return
+        if t_captura is None:
+            t_captura = time.monotonic()
+        self._audio_q.put(("audio", t_captura, pcm))
+
+    def finalize(self, t_captura: float = None):
+        # avisa que a frase terminou (o VAD cortou o silêncio que fecharia ela)
+        if not self.available:
+            return
+        if t_captura is None:
+            t_captura = time.monotonic()
+        self._audio_q.put(("fim", t_captura))
+
+    def set_position(self, fen: str):
+        # pode ir antes do "pronto": o worker lê a fila depois de carregar
+        if self._process is None:
+            return
+        self._audio_q.put(("posicao", fen))
+
+    def discard(self):
+        if self._process is None:
+            return
+        self._audio_q.put(("descartar",))
+
+    def mark(self, ident):
+        if self._process is None:
+            return
+        self._audio_q.put(("marca", ident))
+
+    def poll(self) -> list:
+        # recolhe todos os resultados já prontos sem bloquear
+        resultados = []
+        if self._result_q is None:
+            return resultados
+        while True:
+            try:
+                msg = self._result_q.get_nowait()
+            except queue.Empty:
+                break
+            if msg.get("tipo") in ("pronto", "erro"):
+                self._on_status(msg)
+            resultados.append(msg)
+        return resultados
+
+    def stop(self):
+        self.available = False
+        if self.status != "erro":
+            self.status = "desligado"
+        if self._process is None:
+            return
+        try:
+            self._audio_q.put(None)
+            self._process.join(timeout=1.0)
+        except Exception:
+            pass
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+
+    # ----- lado do processo do reconhecedor -----
+
+    @staticmethod
+    def _worker_process(audio_q, result_q, model_path, sample_rate, grammar_json, opcoes):
+        # função que roda em processo separado
+        try:
+            import vosk
+            model = vosk.Model(model_path)
+            sessao = RecognizerSession(model, sample_rate, grammar_json=grammar_json, **opcoes)
+        except Exception as e:
+            result_q.put({"tipo": "erro", "msg": str(e)})
+            return
+        result_q.put({"tipo": "pronto"})
+
+        while True:
+            msg = audio_q.get()
+            t_worker = time.monotonic()
+            if msg is None:
+                print("Estatísticas do reconhecedor:", sessao.stats())
+                break
+            try:
+                if msg[0] == "audio":
+                    resultado = sessao.on_audio(msg[1], msg[2])
+                elif msg[0] == "fim":
+                    resultado = sessao.on_fim(msg[1])
+                elif msg[0] == "posicao":
+                    resultado = sessao.on_posicao(msg[1])
+                elif msg[0] == "descartar":
+                    resultado = sessao.on_descartar()
+                elif msg[0] == "marca":
+                    # tudo o que veio antes na fila já foi processado
+                    resultado = {"tipo": "marca", "id": msg[1], "t": time.monotonic()}
+                else:
+                    resultado = None
+            except Exception as e:
+                print("Erro no reconhecedor:", e)
+                continue
+            if resultado is not None:
+                if resultado.get("tipo") == "resultado":
+                    resultado["t_worker"] = t_worker
+                result_q.put(resultado)
+
+
+class RecognizerPool:
+    """
+    Cache LRU de KaldiRecognizer por gramática, em cima de um único
+    vosk.Model. Montar um recognizer com gramática JSON custa caro; com a
+    gramática por posição isso viraria um custo por lance.
+    """
+
+    def __init__(self, model, sample_rate=16000, max_recognizers=32, max_alternativas=0):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.max_alternativas = max_alternativas
+        self.max_recognizers = max_recognizers
+        self._pool = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def grammar_key(grammar_json) -> str:
+        if not grammar_json:
+            return ""
+        return hashlib.blake2b(grammar_json.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, grammar_json=None):
+        chave = self.grammar_key(grammar_json)
+        rec = self._pool.get(chave)
+        if rec is not None:
+            self.hits += 1
+            self._pool.move_to_end(chave)
+            # pode ter sobrado áudio de uma frase interrompida
+            rec.Reset()
+            return rec
+
+        self.misses += 1
+        rec = self._criar(grammar_json)
+        self._pool[chave] = rec
+        if len(self._pool) > self.max_recognizers:
+            self._pool.popitem(last=False)
+            self.evictions += 1
+        return rec
+
+    def _criar(self, grammar_json):
+        import vosk
+        if grammar_json:
+            rec = vosk.KaldiRecognizer(self.model, self.sample_rate, grammar_json)
+        else:
+            rec = vosk.KaldiRecognizer(self.model, self.sample_rate)
+        if self.max_alternativas > 1:
+            rec.SetMaxAlternatives(self.max_alternativas)
+        return rec
+
+    def stats(self) -> dict:
+        return {"tamanho": len(self._pool), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+class RecognizerSession:
+    """
+    Estado do reconhecimento dentro do processo do worker: recebe o áudio,
+    conversa com o KaldiRecognizer e decide quando um texto vira jogada.
+
+    Com modo_parcial ligado, o PartialResult() é analisado a cada bloco; se
+    ele já forma uma única jogada legal na posição atual e ela se mantém por
+    confirmacao_ms de áudio, a jogada é enviada na hora e o reconhecedor é
+    resetado, sem esperar o fim da frase. Uma parcial que ainda é o começo
+    de outra frase legal ("roque" de "roque grande", "a sete para a oito"
+    de "... promove cavalo") não é enviada: fica para o resultado final.
+
+    Com gramatica_dinamica ligada, cada posição recebida troca a gramática
+    fixa por uma restrita às jogadas legais (GrammarCache), o que diminui o
+    espaço de busca do decodificador.
+
+    Com max_alternativas > 1 o Vosk devolve um N-best; a primeira
+    alternativa que vira jogada legal é usada, então uma frase mal
+    transcrita na melhor hipótese ainda pode dar certo sem repetir.
+
+    Se nenhuma alternativa parseia, o FuzzyMoveMatcher procura a jogada
+    legal de forma falada mais próxima; ela só é aceita com custo baixo e
+    margem suficiente sobre a segunda colocada.
+    """
+
+    def __init__(self, model, sample_rate=16000, grammar_json=None, gramatica_dinamica=True,
+                 modo_parcial=True, confirmacao_ms=150, max_alternativas=5,
+                 fuzzy=True, fuzzy_custo_max=1.0, fuzzy_margem_min=0.4):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.grammar_json_fixa = grammar_json
+        self.gramatica_dinamica = gramatica_dinamica
+        self.gramaticas = GrammarCache()
+        self.pool = RecognizerPool(model, sample_rate, max_alternativas=max_alternativas)
+        self._grammar_atual = grammar_json
+        self.recognizer = self.pool.get(grammar_json)
+        self.modo_parcial = modo_parcial
+        self.confirmacao_amostras = int(sample_rate * confirmacao_ms / 1000)
+        self.board = chess.Board()
+        self.indice = LegalMoveIndex(self.board)
+        self.matcher = FuzzyMoveMatcher() if fuzzy else None
+        self.fuzzy_custo_max = fuzzy_custo_max
+        self.fuzzy_margem_min = fuzzy_margem_min
+        self._parcial_mv = None
+        self._parcial_amostras = 0
+        self._prefixos = prefixos_estritos(build_grammar(self.board)[:-1])
+        # depois de confirmar pela parcial, espera a interface mandar a
+        # posição nova antes de aceitar outra (evita jogar a mesma duas vezes)
+        self._aguardando_posicao = False
+        self._t_aceito = None
+
+    def on_posicao(self, fen: str):
+        self.board.set_fen(fen)
+        self.indice.rebuild(self.board)
+        if self.gramatica_dinamica:
+            grammar_json = self.gramaticas.grammar_json(self.board)
+            if grammar_json != self._grammar_atual:
+                self.recognizer = self.pool.get(grammar_json)
+                self._grammar_atual = grammar_json
+        # depois da gramática, para a entrada do cache já contar como hit/miss
+        self._prefixos = self.gramaticas.prefixos(self.board)
+        self._aguardando_posicao = False
+        self._limpar_parcial()
+        return None
+
+    def on_audio(self, t_captura: float, pcm: bytes):
+        completo = self.recognizer.AcceptWaveform(pcm)
+        self._t_aceito = time.monotonic()
+        if completo:
+            self._limpar_parcial()
+            return self._resultado(self.recognizer.Result(), t_captura)
+        if self.modo_parcial and not self._aguardando_posicao:
+            return self._checar_parcial(t_captura, len(pcm) // 2)
+        return None
+
+    def on_fim(self, t_captura: float):
+        self._limpar_parcial()
+        result_json = self.recognizer.FinalResult()
+        self._t_aceito = time.monotonic()
+        return self._resultado(result_json, t_captura)
+
+    def on_descartar(self):
+        self.recognizer.Reset()
+        self._limpar_parcial()
+        # a interface não aplicou a jogada da parcial (ou mudou de turno): volta a ouvir parciais
+        self._aguardando_posicao = False
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "gramaticas_hits": self.gramaticas.hits,
+            "gramaticas_misses": self.gramaticas.misses,
+            "pool": self.pool.stats(),
+        }
+
+    def _limpar_parcial(self):
+        self._parcial_mv = None
+        self._parcial_amostras = 0
+
+    def _checar_parcial(self, t_captura, n_amostras):
+        texto = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        self._t_aceito = time.monotonic()
+        candidatos = self._interpretar(texto) if texto else []
+        if len(candidatos) != 1 or " ".join(texto.split()) in self._prefixos:
+            # nada ainda, ambíguo, ou a frase pode continuar: espera mais palavras
+            self._limpar_parcial()
+            return None
+        mv = candidatos[0]
+        if mv != self._parcial_mv:
+            # jogada nova na parcial: começa a contar a confirmação
+            self._parcial_mv = mv
+            self._parcial_amostras = 0
+        else:
+            self._parcial_amostras += n_amostras
+        if self._parcial_amostras < self.confirmacao_amostras:
+            return None
+
+        self.recognizer.Reset()
+        self._limpar_parcial()
+        self._aguardando_posicao = True
+        return self._montar_resultado(texto, t_captura, [mv], [0], [], parcial=True)
+
+    def _interpretar(self, texto) -> list:
+        # jogadas legais compatíveis com o texto, via LegalMoveIndex
+        return resolve_candidates(parse_command(texto), self.board, self.indice)
+
+    @staticmethod
+    def _alternativas(result_json) -> list:
+        # [(texto, confiança)], da mais para a menos confiável
+        r = json.loads(result_json)
+        if "alternatives" in r:
+            alts = [(a.get("text", ""), a.get("confidence", 0.0)) for a in r["alternatives"]]
+            alts.sort(key=lambda a: a[1], reverse=True)
+            return [a for a in alts if a[0]]
+        texto = r.get("text", "")
+        return [(texto, 1.0)] if texto else []
+
+    def _resultado(self, result_json, t_captura):
+        """
+        Confronta cada alternativa do N-best com as jogadas legais. Os
+        candidatos saem na ordem de confiança, cada um com o índice da
+        alternativa que o gerou (0 = a transcrição principal).
+        """
+        alternativas = self._alternativas(result_json)
+        if not alternativas:
+            return None
+        candidatos, indices, ambiguas = [], [], []
+        for i, (texto, _) in enumerate(alternativas):
+            moves = self._interpretar(texto)
+            if len(moves) == 1:
+                if moves[0] not in candidatos:
+                    candidatos.append(moves[0])
+                    indices.append(i)
+            elif len(moves) > 1 and not ambiguas:
+                ambiguas = moves
+        if candidatos:
+            ambiguas = []
+        elif not ambiguas and self.matcher is not None:
+            # nada parseou: tenta a forma falada mais próxima de uma jogada legal
+            for i, (texto, _) in enumerate(alternativas):
+                r = self.matcher.match(texto, self.board)
+                if r is not None and r.custo <= self.fuzzy_custo_max and r.margem >= self.fuzzy_margem_min:
+                    return self._montar_resultado(alternativas[0][0], t_captura, [r.move], [i], [],
+                                                  aproximado=True)
+        return self._montar_resultado(alternativas[0][0], t_captura, candidatos, indices, ambiguas)
+
+    def _montar_resultado(self, texto, t_captura, candidatos, indices, ambiguas, parcial=False, aproximado=False):
+        return {
+            "tipo": "resultado",
+            "texto": texto,
+            "candidatos": candidatos,
+            "alternativas": indices,
+            "ambiguas": ambiguas,
+            "parcial": parcial,
+            "aproximado": aproximado,
+            "t_audio": t_captura,
+            "t_aceito": self._t_aceito,
+            "t_decodificado": time.monotonic(),
+        }
@@ -0,0 +1,121 @@
+# voice_turn.py
+
+import time
+
+from latency import percentil
+
+OUVINDO = "ouvindo"
+PAUSADO = "pausado"
+DRENANDO = "drenando"
+
+
+class TurnGate:
+    """
+    Liga e desliga o caminho captura -> VAD -> reconhecedor conforme o turno.
+
+    - ouvindo: o áudio segue para o VAD e o worker normalmente.
+    - pausado: vez do bot (ou fora da partida). O áudio é lido do ring
+      mas só os últimos pre_roll_ms ficam guardados; nada é decodificado
+      e resultados que ainda cheguem do worker são descartados.
+    - drenando: o turno voltou para o jogador. O worker recebe
+      "descartar" e uma marca; até a marca voltar, resultados antigos são
+      jogados fora e o áudio novo fica guardado (com o pre-roll). Quando a
+      marca chega, o guardado vai para o VAD e o estado vira ouvindo.
+
+    O tempo entre o lance do bot e a volta da marca é a latência até
+    "pronto para ouvir", guardada em latencias_ms. Com um
+    VoiceLatencyTracker em latencias, a espera de cada bloco no ring
+    também é registrada.
+    """
+
+    def __init__(self, capture, vad, reconhecedor, sample_rate=16000, pre_roll_ms=300, max_espera_s=4.0,
+                 latencias=None):
+        self.capture = capture
+        self.latencias = latencias
+        self.vad = vad
+        self.reconhecedor = reconhecedor
+        self.sample_rate = sample_rate
+        self.pre_roll_bytes = int(sample_rate * pre_roll_ms / 1000) * 2
+        self.max_espera_bytes = int(sample_rate * max_espera_s) * 2
+        self.estado = PAUSADO
+        self._guardado = b""
+        self._t_guardado = None
+        self._marca = 0
+        self._t_evento = None
+
+        # estatísticas
+        self.latencias_ms = []
+        self.resultados_descartados = 0
+        self.bytes_pausados = 0
+
+    def atualizar(self, deve_ouvir: bool, t_evento: float = None):
+        """
+        Chamado uma vez por frame. t_evento é o instante do lance que
+        devolveu a vez ao jogador (para medir a latência até ouvir).
+        """
+        if deve_ouvir and self.estado == PAUSADO:
+            self._marca += 1
+            self._t_evento = t_evento if t_evento is not None else time.monotonic()
+            self.reconhecedor.discard()
+            self.reconhecedor.mark(("turno", self._marca))
+            self.estado = DRENANDO
+        elif not deve_ouvir and self.estado != PAUSADO:
+            # a frase em andamento era para o lance que já passou
+            self.reconhecedor.discard()
+            self.vad.reset()
+            self._guardado = b""
+            self.estado = PAUSADO
+
+    def processar_audio(self):
+        dados, t_primeiro, t_ultimo = self.capture.read_available_com_tempo()
+        if not dados:
+            return
+        if self.estado == OUVINDO:
+            if self.latencias is not None:
+                self.latencias.registrar("espera_captura", (time.monotonic() - t_primeiro) * 1000)
+            self._alimentar(dados, t_ultimo)
+            return
+        self._t_guardado = t_ultimo
+        guardado = self._guardado + dados
+        limite = self.pre_roll_bytes if self.estado == PAUSADO else self.max_espera_bytes
+        if len(guardado) > limite:
+            self.bytes_pausados += len(guardado) - limite
+            guardado = guardado[len(guardado) - limite:]
+        self._guardado = guardado
+
+    def _alimentar(self, dados: bytes, t_captura: float):
+        # t_captura = chegada do bloco mais novo; vai junto até o resultado
+        for pcm, fim_de_fala in self.vad.process(dados):
+            self.reconhecedor.feed(pcm, t_captura)
+            if fim_de_fala:
+                self.reconhecedor.finalize(t_captura)
+
+    def filtrar(self, mensagens: list) -> list:
+        """Tira da lista dos resultados do worker os que são de outro turno."""
+        validas = []
+        for msg in mensagens:
+            tipo = msg.get("tipo")
+            if tipo == "marca" and msg.get("id") == ("turno", self._marca):
+                if self.estado == DRENANDO:
+                    # pronto quando a interface recebe a marca, não quando o worker a viu
+                    self.latencias_ms.append((time.monotonic() - self._t_evento) * 1000)
+                    self.estado = OUVINDO
+                    guardado, self._guardado = self._guardado, b""
+                    if guardado:
+                        self._alimentar(guardado, self._t_guardado)
+                continue
+            if tipo == "resultado" and self.estado != OUVINDO:
+                self.resultados_descartados += 1
+                continue
+            validas.append(msg)
+        return validas
+
+    def stats(self) -> dict:
+        return {
+            "estado": self.estado,
+            "turnos": len(self.latencias_ms),
+            "latencia_pronto_ms_p50": percentil(self.latencias_ms, 50),
+            "latencia_pronto_ms_p95": percentil(self.latencias_ms, 95),
+            "resultados_descartados": self.resultados_descartados,
+            "segundos_nao_decodificados": round(self.bytes_pausados / 2 / self.sample_rate, 1),
+        }